@@ -169,10 +169,12 @@ const App = () => {
           console.log('Processing state update:', data);
           console.log('Completion percentage:', data.completion_percentage);
           console.log('Current step:', data.current_step);
-          setSessionData({
+          // Updates only carry the agent statuses that changed; merge them into what we have
+          setSessionData(prev => ({
             ...data,
+            agent_statuses: { ...(prev?.agent_statuses || {}), ...data.agent_statuses_delta },
             completion_percentage: isAnimating ? animatedProgress : data.completion_percentage
-          });
+          }));
           
           if (data.completion_percentage >= 100) {
             console.log('Analysis completed, loading results...');
@@ -4,15 +4,11 @@ Multi-agent system using LangGraph for intelligent repository analysis.
 """
 
 import os
-import asyncio
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Import the FastAPI app
-from src.api.main import app
-
 if __name__ == "__main__":
     import uvicorn
     
@@ -20,13 +16,30 @@ if __name__ == "__main__":
     host = os.getenv("API_HOST", "0.0.0.0")
     port = int(os.getenv("API_PORT", 8000))
     environment = os.getenv("ENVIRONMENT", "development")
+    development = environment == "development"
+    
+    # Sessions live in process memory, so extra workers only suit deployments with sticky routing
+    workers = 1 if development else int(os.getenv("API_WORKERS", 1))
+    if workers > 1:
+        print(f"⚠️  Running {workers} workers: sessions are per-process, so route each session's "
+              "requests and WebSocket to the same worker (sticky sessions)")
     
-    # Run the application
+    # Run the application (import string so reload and multiple workers work)
     uvicorn.run(
-        app,
+        "src.api.main:app",
         host=host,
         port=port,
-        reload=environment == "development",
+        # "auto" picks uvloop and httptools when installed and falls back where they are not (e.g. Windows)
+        loop="auto",
+        http="auto",
+        workers=workers,
+        reload=development,
+        # Updates are small JSON frames; per-message deflate would cost a zlib round trip each
+        ws="websockets",
+        ws_per_message_deflate=False,
+        # WebSocket keepalive via protocol ping frames rather than application messages
+        ws_ping_interval=20,
+        ws_ping_timeout=20,
         log_level="info"
     )
 
@@ -3,15 +3,259 @@ Insight Generation Agent - AI-powered pattern recognition and strategic recommen
 Uses advanced reasoning to identify actionable insights from trend analysis.
 """
 
-from typing import Dict, Any, List
+import asyncio
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from operator import attrgetter
+from typing import TYPE_CHECKING, Dict, Any, List, Tuple, Type, Union
 from datetime import datetime, timedelta
 import json
+import re
+import numpy as np
 
-from langchain_openai import ChatOpenAI
-from langchain.schema import HumanMessage, SystemMessage, AIMessage
-from langchain.prompts import ChatPromptTemplate
+# orjson parses LLM responses several times faster; fall back to the stdlib parser
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+import httpx
+import openai
+from langchain_core.prompts import ChatPromptTemplate
+from pydantic import BaseModel, ValidationError
 
 from ..core.state import WorkflowState, AgentStatus, GitHubIssue, TrendAnalysis
+from ..core.llm_cache import CachedChatLLM
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
+
+MAINTENANCE_KEYWORDS = ('bug', 'fix', 'error', 'crash', 'broken', 'maintenance', 'update', 'security')
+URGENT_LABELS = frozenset(('critical', 'urgent', 'high'))
+STRATEGIC_HISTORY_SIZE = 20
+
+# Below these, insights come from the rule-based assessments without an LLM call
+MIN_ISSUES_FOR_LLM = 5
+MIN_CONFIDENCE_FOR_LLM = 0.2
+
+# Fixed system message and instructions form a stable prefix for provider-side prompt caching
+INSIGHT_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are a senior engineering advisor assessing the health, maintenance load, community, strategy and risks of software projects."),
+    ("human", "Analyze this GitHub repository across the five areas below. Respond with one JSON object "
+              "whose top-level keys are {areas}; each value is an object with the keys listed in that "
+              "area's section.\n{sections}")
+])
+
+
+
+# Static section bodies, filled per analysis with str.format_map
+HEALTH_PROMPT = """Analyze the repository health based on these metrics:
+
+Issue Metrics:
+- Total Issues: {total_issues}
+- Open Issues: {open_issues} ({open_ratio:.1%})
+- Recent Issues (30 days): {recent_issues}
+- Average Comments per Issue: {avg_comments:.1f}
+- Trend Direction: {trend_direction}
+- Trend Confidence: {confidence_score:.2f}
+
+Provide insights about:
+1. Overall repository health (scale 1-10)
+2. Key health indicators (positive and negative)
+3. Comparison to typical healthy repositories
+4. Specific areas of concern
+
+Keys: health_score, positive_indicators, concerns, summary
+"""
+
+MAINTENANCE_PROMPT = """Analyze maintenance patterns and needs:
+
+Maintenance Metrics:
+- Total Issues: {total_issues}
+- Maintenance-related Issues: {maintenance_count} ({maintenance_ratio:.1%})
+- Urgent Maintenance Issues: {urgent_maintenance_count}
+- Old Open Issues (>90 days): {old_open_count}
+- Overall Trend: {trend_direction}
+
+Recent Maintenance Issues (sample):
+{maintenance_sample}
+
+Provide analysis on:
+1. Maintenance load assessment
+2. Technical debt indicators
+3. Resource allocation recommendations
+4. Prioritization strategy
+
+Keys: load_assessment, debt_score, recommendations, priority_areas
+"""
+
+COMMUNITY_PROMPT = """Analyze community engagement and health:
+
+Community Metrics:
+- Unique Contributors: {unique_authors}
+- Total Comments: {total_comments}
+- Highly Engaged Issues (>5 comments): {highly_engaged_count}
+- Power Users (>3 issues): {power_users}
+- Average Comments per Issue: {avg_comments:.1f}
+
+Top Contributors:
+{top_contributors}
+
+Provide insights on:
+1. Community health score (1-10)
+2. Engagement patterns
+3. Contributor diversity
+4. Community growth opportunities
+
+Keys: health_score, engagement_level, diversity_assessment, growth_opportunities
+"""
+
+STRATEGIC_PROMPT = """Generate strategic insights for repository management:
+
+Strategic Context:
+- Total Issues Analyzed: {total_issues}
+- Feature Requests: {feature_count} ({feature_ratio:.1%})
+- Bug Reports: {bug_count} ({bug_ratio:.1%})
+- Recent Activity (30 days): {recent_issues} issues
+- Annualized Growth Rate: {growth_rate:.1f} issues/year
+- Trend Direction: {trend_direction}
+- Analysis Confidence: {confidence_score:.2f}
+
+Anomalies Detected: {anomalies}
+
+Provide strategic analysis on:
+1. Resource allocation priorities
+2. Product roadmap implications
+3. Team scaling recommendations
+4. Process improvement opportunities
+5. Risk mitigation strategies
+
+Keys: priorities, roadmap_impact, scaling_advice, process_improvements, risk_mitigation
+"""
+
+RISK_PROMPT = """Assess risks and opportunities for this repository:
+
+Risk Indicators:
+- Identified Risk Factors: {risk_factors}
+- Open Issues: {open_issues}/{total_issues}
+- Trend: {trend_direction} (slope: {trend_slope:.2f})
+- Security Issues: {security_count}
+- Anomalies: {anomalies}
+- Analysis Confidence: {confidence_score:.2f}
+
+Provide assessment with:
+1. Overall risk level (low/medium/high)
+2. Top 3 risks with impact assessment
+3. Top 3 opportunities for improvement
+4. Recommended actions
+
+Keys: overall_risk, top_risks, opportunities, recommended_actions
+"""
+
+
+class HealthInsights(BaseModel):
+    """Expected shape of the LLM's repository health section."""
+    health_score: float
+    positive_indicators: List[str]
+    concerns: List[str]
+    summary: str
+
+
+class MaintenanceInsights(BaseModel):
+    """Expected shape of the LLM's maintenance section."""
+    load_assessment: str
+    debt_score: float
+    recommendations: List[str]
+    priority_areas: List[str]
+
+
+class CommunityInsights(BaseModel):
+    """Expected shape of the LLM's community section."""
+    health_score: float
+    engagement_level: str
+    diversity_assessment: str
+    growth_opportunities: List[str]
+
+
+class StrategicInsights(BaseModel):
+    """Expected shape of the LLM's strategic section."""
+    priorities: List[str]
+    roadmap_impact: str
+    scaling_advice: str
+    process_improvements: List[str]
+    risk_mitigation: List[str]
+
+
+class RiskAssessment(BaseModel):
+    """Expected shape of the LLM's risk section."""
+    overall_risk: str
+    top_risks: List[Union[str, Dict[str, Any]]]
+    opportunities: List[Union[str, Dict[str, Any]]]
+    recommended_actions: List[Union[str, Dict[str, Any]]]
+
+
+# Each section of the combined response is validated on its own so one bad section doesn't discard the rest
+INSIGHT_SCHEMAS: Dict[str, Type[BaseModel]] = {
+    "health": HealthInsights,
+    "maintenance": MaintenanceInsights,
+    "community": CommunityInsights,
+    "strategic": StrategicInsights,
+    "risks": RiskAssessment
+}
+
+_ISSUE_FIELDS = attrgetter('state', 'created_at', 'comments_count', 'author', 'title', 'labels_lower', 'search_text')
+
+
+def _keyword_pattern(keywords) -> re.Pattern:
+    """Compile keywords into one alternation so each text is scanned once per category."""
+    return re.compile('|'.join(re.escape(keyword) for keyword in keywords))
+
+
+_MAINTENANCE_PATTERN = _keyword_pattern(MAINTENANCE_KEYWORDS)
+_FEATURE_PATTERN = _keyword_pattern(('feature', 'enhancement'))
+_BUG_PATTERN = _keyword_pattern(('bug', 'error'))
+_SECURITY_PATTERN = _keyword_pattern(('security', 'vulnerability'))
+
+
+def _matches(pattern: re.Pattern, texts: List[str]) -> np.ndarray:
+    """Mask of the texts the pattern matches anywhere."""
+    search = pattern.search
+    return np.fromiter((search(text) is not None for text in texts), dtype=bool, count=len(texts))
+
+
+@dataclass
+class IssueStats:
+    """Issue metrics shared by every insight category, computed once per run."""
+    total: int = 0
+    open_count: int = 0
+    recent_count: int = 0
+    old_open_count: int = 0
+    comments_sum: int = 0
+    highly_engaged_count: int = 0
+    maintenance_count: int = 0
+    urgent_maintenance_count: int = 0
+    feature_count: int = 0
+    bug_count: int = 0
+    security_count: int = 0
+    maintenance_sample: List[str] = field(default_factory=list)
+    author_counts: Counter = field(default_factory=Counter)
+    
+    # Derived ratios, guarded against an empty issue list once here
+    avg_comments: float = field(init=False, default=0.0)
+    open_ratio: float = field(init=False, default=0.0)
+    maintenance_ratio: float = field(init=False, default=0.0)
+    feature_ratio: float = field(init=False, default=0.0)
+    bug_ratio: float = field(init=False, default=0.0)
+    
+    def __post_init__(self):
+        if self.total:
+            self.avg_comments = self.comments_sum / self.total
+            self.open_ratio = self.open_count / self.total
+            self.maintenance_ratio = self.maintenance_count / self.total
+            self.feature_ratio = self.feature_count / self.total
+            self.bug_ratio = self.bug_count / self.total
 
 
 class InsightGenerationAgent:
@@ -19,8 +263,9 @@ class InsightGenerationAgent:
     Advanced AI agent that generates strategic insights and recommendations.
     """
     
-    def __init__(self, llm: ChatOpenAI):
-        self.llm = llm
+    def __init__(self, llm: "ChatOpenAI"):
+        # Repeat analyses rebuild identical prompts; reuse their responses
+        self.llm = CachedChatLLM(llm) if llm is not None else None
         self.agent_id = "insight_agent"
         self.insight_categories = [
             "maintenance_load",
@@ -48,28 +293,18 @@ class InsightGenerationAgent:
             # Get agent memory for context
             memory = state.get_agent_memory(self.agent_id)
             
-            # Generate different types of insights
-            insights = {}
-            
-            # 1. Repository health insights
-            state.update_progress("insight_generation", 25.0, "Analyzing repository health...")
-            insights["health"] = await self._generate_health_insights(state.raw_issues, state.trend_analysis)
+            # One pass over the issues feeds every insight category; run it off the event loop
+            now = datetime.now()
+            stats = await asyncio.to_thread(self._compute_issue_stats, state.raw_issues, now)
             
-            # 2. Maintenance insights
-            state.update_progress("insight_generation", 40.0, "Identifying maintenance patterns...")
-            insights["maintenance"] = await self._generate_maintenance_insights(state.raw_issues, state.trend_analysis)
-            
-            # 3. Community insights
-            state.update_progress("insight_generation", 55.0, "Analyzing community engagement...")
-            insights["community"] = await self._generate_community_insights(state.raw_issues)
-            
-            # 4. Strategic recommendations
-            state.update_progress("insight_generation", 70.0, "Generating strategic recommendations...")
-            insights["strategic"] = await self._generate_strategic_insights(state.raw_issues, state.trend_analysis, memory)
-            
-            # 5. Risk assessment
-            state.update_progress("insight_generation", 85.0, "Assessing risks and opportunities...")
-            insights["risks"] = await self._assess_risks_and_opportunities(state.raw_issues, state.trend_analysis)
+            # Generate every insight category in one structured LLM call
+            state.update_progress("insight_generation", 25.0, "Analyzing health, maintenance, community, strategy and risks...")
+            # Too little data or too uncertain a trend for the LLM to add anything over the rules
+            rule_based = stats.total < MIN_ISSUES_FOR_LLM or state.trend_analysis.confidence_score < MIN_CONFIDENCE_FOR_LLM
+            insights = await self._generate_all_insights(stats, state.trend_analysis, memory, state.repository_url,
+                                                         use_llm=not rule_based)
+            state.processed_data["ai_insights_source"] = "rule_based" if rule_based else "llm"
+            state.update_progress("insight_generation", 85.0, "Structuring insights and recommendations...")
             
             # Store insights in state
             state.processed_data["ai_insights"] = insights
@@ -78,7 +313,7 @@ class InsightGenerationAgent:
             await self._add_structured_insights_to_state(state, insights)
             
             # Update agent memory with insights patterns
-            self._update_agent_memory(memory, insights, state.repository_url)
+            self._update_agent_memory(memory, insights, state.repository_url, now)
             
             state.update_progress("insight_generation", 100.0, "Strategic insights generated successfully")
             state.update_agent_status(self.agent_id, AgentStatus.COMPLETED, output={
@@ -93,249 +328,238 @@ class InsightGenerationAgent:
         
         return state
     
-    async def _generate_health_insights(self, issues: List[GitHubIssue], trend_analysis: TrendAnalysis) -> Dict[str, Any]:
-        """Generate insights about repository health."""
-        
-        total_issues = len(issues)
-        open_issues = len([i for i in issues if i.state == "open"])
-        
-        # Calculate metrics
-        open_ratio = open_issues / total_issues if total_issues > 0 else 0
-        recent_issues = len([i for i in issues if (datetime.now() - i.created_at).days <= 30])
-        avg_comments = sum(i.comments_count for i in issues) / len(issues) if issues else 0
-        
-        # Use LLM for health assessment
-        health_prompt = f"""
-        Analyze the repository health based on these metrics:
-        
-        Issue Metrics:
-        - Total Issues: {total_issues}
-        - Open Issues: {open_issues} ({open_ratio:.1%})
-        - Recent Issues (30 days): {recent_issues}
-        - Average Comments per Issue: {avg_comments:.1f}
-        - Trend Direction: {trend_analysis.trend_direction}
-        - Trend Confidence: {trend_analysis.confidence_score:.2f}
-        
-        Provide insights about:
-        1. Overall repository health (scale 1-10)
-        2. Key health indicators (positive and negative)
-        3. Comparison to typical healthy repositories
-        4. Specific areas of concern
-        
-        Format as JSON with keys: health_score, positive_indicators, concerns, summary
-        """
-        
+    def _issue_columns(self, issues: List[GitHubIssue]) -> Dict[str, Any]:
+        """Lay the issue fields the insights need out as parallel columns."""
+        states, created_at, comments, authors, titles, labels_lower, issue_text = zip(*map(_ISSUE_FIELDS, issues))
+        
+        # Joining labels with newlines keeps keywords from matching across two labels
+        labels_text = ['\n'.join(issue_labels) for issue_labels in labels_lower]
+        
+        return {
+            "is_open": np.array(states) == "open",
+            "created_at": np.array(created_at, dtype='datetime64[us]'),
+            "comments": np.array(comments, dtype=np.int64),
+            "authors": authors,
+            "titles": titles,
+            "labels_lower": labels_lower,
+            "labels_text": labels_text,
+            "issue_text": issue_text
+        }
+    
+    def _compute_issue_stats(self, issues: List[GitHubIssue], now: datetime) -> IssueStats:
+        """Collect every per-issue metric the insight categories need with array reductions."""
+        columns = self._issue_columns(issues)
+        is_open = columns["is_open"]
+        created_at = columns["created_at"]
+        
+        # Cutoffs equivalent to (now - created_at).days <= 30 and > 90
+        recent = created_at > np.datetime64(now - timedelta(days=31), 'us')
+        old = created_at <= np.datetime64(now - timedelta(days=91), 'us')
+        comments = columns["comments"]
+        
+        maintenance = _matches(_MAINTENANCE_PATTERN, columns["issue_text"])
+        urgent = np.fromiter((not URGENT_LABELS.isdisjoint(issue_labels) for issue_labels in columns["labels_lower"]),
+                             dtype=bool, count=len(issues))
+        labels_text = columns["labels_text"]
+        
+        return IssueStats(
+            total=len(issues),
+            open_count=int(is_open.sum()),
+            recent_count=int(recent.sum()),
+            old_open_count=int((is_open & old).sum()),
+            comments_sum=int(comments.sum()),
+            highly_engaged_count=int((comments > 5).sum()),
+            maintenance_count=int(maintenance.sum()),
+            urgent_maintenance_count=int((maintenance & urgent).sum()),
+            feature_count=int(_matches(_FEATURE_PATTERN, labels_text).sum()),
+            bug_count=int(_matches(_BUG_PATTERN, labels_text).sum()),
+            security_count=int(_matches(_SECURITY_PATTERN, labels_text).sum()),
+            maintenance_sample=[columns["titles"][i] for i in np.flatnonzero(maintenance)[:5]],
+            author_counts=Counter(columns["authors"])
+        )
+    
+    async def _generate_all_insights(self, stats: IssueStats, trend_analysis: TrendAnalysis, memory: Any,
+                                     repository_url: str, use_llm: bool = True) -> Dict[str, Any]:
+        """Generate every insight category from a single structured LLM call."""
+        
+        sections = {
+            "health": self._health_section(stats, trend_analysis),
+            "maintenance": self._maintenance_section(stats, trend_analysis),
+            "community": self._community_section(stats),
+            "strategic": self._strategic_section(stats, trend_analysis),
+            "risks": self._risk_section(stats, trend_analysis)
+        }
+        
+        if not use_llm:
+            return {name: fallback for name, (_, fallback) in sections.items()}
+        
+        messages = INSIGHT_PROMPT.format_messages(
+            areas=", ".join(sections),
+            sections="".join(f"\n## {name}\n{prompt}" for name, (prompt, _) in sections.items())
+        )
+        
+        # The prompt carries only aggregate stats, so scope cached responses to the repository
+        llm_options = {"cache_namespace": repository_url, "response_format": {"type": "json_object"}}
         try:
-            response = await self.llm.ainvoke([
-                SystemMessage(content="You are a software engineering expert analyzing repository health."),
-                HumanMessage(content=health_prompt)
-            ])
+            response = await self.llm.ainvoke(messages, **llm_options)
             
-            # Try to parse JSON response
-            health_data = json.loads(response.content)
-            return health_data
+            combined = _json_loads(response.content)
+            error = None if isinstance(combined, dict) else "Response was not a JSON object"
             
-        except (json.JSONDecodeError, Exception) as e:
-            # Fallback to rule-based assessment
-            health_score = 7
-            if open_ratio > 0.8:
-                health_score -= 2
-            if trend_analysis.trend_direction == "increasing":
-                health_score -= 1
-            if avg_comments < 1:
-                health_score -= 1
-                
-            return {
-                "health_score": max(1, health_score),
-                "positive_indicators": ["Active issue tracking"] if total_issues > 10 else [],
-                "concerns": ["High open issue ratio"] if open_ratio > 0.7 else [],
-                "summary": f"Repository shows {'concerning' if health_score < 5 else 'moderate' if health_score < 7 else 'good'} health indicators.",
-                "error": str(e)
-            }
-    
-    async def _generate_maintenance_insights(self, issues: List[GitHubIssue], trend_analysis: TrendAnalysis) -> Dict[str, Any]:
-        """Generate insights about maintenance patterns and needs."""
-        
-        # Identify maintenance-related issues
-        maintenance_keywords = ['bug', 'fix', 'error', 'crash', 'broken', 'maintenance', 'update', 'security']
-        maintenance_issues = []
+        except (openai.APIError, httpx.HTTPError, asyncio.TimeoutError, ValueError) as e:
+            # API failures (after the client's own retries), transport errors mid-stream and unparseable
+            # output; anything else is a bug
+            combined, error = {}, str(e)
+        
+        insights = {}
+        for name, (_, fallback) in sections.items():
+            section_error = error
+            if section_error is None and name not in combined:
+                section_error = f"Response had no '{name}' section"
+            if section_error is None:
+                try:
+                    insights[name] = INSIGHT_SCHEMAS[name].model_validate(combined.get(name)).model_dump()
+                    continue
+                except ValidationError as e:
+                    section_error = f"Invalid '{name}' section: {e.error_count()} validation error(s)"
+            
+            # Fall back to the rule-based assessment for this category
+            insights[name] = {**fallback, "error": section_error}
         
-        for issue in issues:
-            issue_text = (issue.title + ' ' + ' '.join(issue.labels)).lower()
-            if any(keyword in issue_text for keyword in maintenance_keywords):
-                maintenance_issues.append(issue)
+        # Only a completion whose every section validated is worth replaying
+        if not any("error" in insight for insight in insights.values()):
+            self.llm.store(messages, response, **llm_options)
         
-        # Calculate metrics
-        maintenance_ratio = len(maintenance_issues) / len(issues) if issues else 0
-        urgent_issues = [i for i in maintenance_issues if any(label.lower() in ['critical', 'urgent', 'high'] for label in i.labels)]
-        old_open_issues = [i for i in issues if i.state == "open" and (datetime.now() - i.created_at).days > 90]
+        # Add context from memory if available
+        historical_patterns = memory.learned_patterns.get("strategic_insights", [])
+        if historical_patterns and "error" not in insights["strategic"]:
+            insights["strategic"]["historical_context"] = list(historical_patterns)[-3:]  # Last 3 analyses
         
-        maintenance_prompt = f"""
-        Analyze maintenance patterns and needs:
+        return insights
+    
+    def _health_section(self, stats: IssueStats, trend_analysis: TrendAnalysis) -> Tuple[str, Dict[str, Any]]:
+        """Build the repository health prompt section and its rule-based fallback."""
         
-        Maintenance Metrics:
-        - Total Issues: {len(issues)}
-        - Maintenance-related Issues: {len(maintenance_issues)} ({maintenance_ratio:.1%})
-        - Urgent Maintenance Issues: {len(urgent_issues)}
-        - Old Open Issues (>90 days): {len(old_open_issues)}
-        - Overall Trend: {trend_analysis.trend_direction}
+        total_issues = stats.total
+        open_issues = stats.open_count
         
-        Recent Maintenance Issues (sample):
-        {chr(10).join([f"- {issue.title}" for issue in maintenance_issues[:5]])}
+        # Calculate metrics
+        open_ratio = stats.open_ratio
+        recent_issues = stats.recent_count
+        avg_comments = stats.avg_comments
+        
+        health_prompt = HEALTH_PROMPT.format_map({
+            "total_issues": total_issues,
+            "open_issues": open_issues,
+            "open_ratio": open_ratio,
+            "recent_issues": recent_issues,
+            "avg_comments": avg_comments,
+            "trend_direction": trend_analysis.trend_direction,
+            "confidence_score": trend_analysis.confidence_score
+        })
         
-        Provide analysis on:
-        1. Maintenance load assessment
-        2. Technical debt indicators
-        3. Resource allocation recommendations
-        4. Prioritization strategy
+        # Fallback to rule-based assessment
+        health_score = 7
+        if open_ratio > 0.8:
+            health_score -= 2
+        if trend_analysis.trend_direction == "increasing":
+            health_score -= 1
+        if avg_comments < 1:
+            health_score -= 1
+        
+        return health_prompt, {
+            "health_score": max(1, health_score),
+            "positive_indicators": ["Active issue tracking"] if total_issues > 10 else [],
+            "concerns": ["High open issue ratio"] if open_ratio > 0.7 else [],
+            "summary": f"Repository shows {'concerning' if health_score < 5 else 'moderate' if health_score < 7 else 'good'} health indicators."
+        }
+    
+    def _maintenance_section(self, stats: IssueStats, trend_analysis: TrendAnalysis) -> Tuple[str, Dict[str, Any]]:
+        """Build the maintenance prompt section and its rule-based fallback."""
         
-        Format as JSON with keys: load_assessment, debt_score, recommendations, priority_areas
-        """
+        # Calculate metrics
+        maintenance_ratio = stats.maintenance_ratio
+        
+        maintenance_prompt = MAINTENANCE_PROMPT.format_map({
+            "total_issues": stats.total,
+            "maintenance_count": stats.maintenance_count,
+            "maintenance_ratio": maintenance_ratio,
+            "urgent_maintenance_count": stats.urgent_maintenance_count,
+            "old_open_count": stats.old_open_count,
+            "trend_direction": trend_analysis.trend_direction,
+            "maintenance_sample": "\n".join(f"- {title}" for title in stats.maintenance_sample)
+        })
         
-        try:
-            response = await self.llm.ainvoke([
-                SystemMessage(content="You are a technical project manager analyzing maintenance needs."),
-                HumanMessage(content=maintenance_prompt)
-            ])
-            
-            return json.loads(response.content)
-            
-        except Exception as e:
-            return {
-                "load_assessment": "high" if maintenance_ratio > 0.6 else "medium" if maintenance_ratio > 0.3 else "low",
-                "debt_score": min(10, len(old_open_issues) / 10),
-                "recommendations": ["Address old open issues", "Implement better testing"],
-                "priority_areas": ["Bug fixes", "Security updates"],
-                "error": str(e)
-            }
+        return maintenance_prompt, {
+            "load_assessment": "high" if maintenance_ratio > 0.6 else "medium" if maintenance_ratio > 0.3 else "low",
+            "debt_score": min(10, stats.old_open_count / 10),
+            "recommendations": ["Address old open issues", "Implement better testing"],
+            "priority_areas": ["Bug fixes", "Security updates"]
+        }
     
-    async def _generate_community_insights(self, issues: List[GitHubIssue]) -> Dict[str, Any]:
-        """Generate insights about community engagement and health."""
+    def _community_section(self, stats: IssueStats) -> Tuple[str, Dict[str, Any]]:
+        """Build the community engagement prompt section and its rule-based fallback."""
         
         # Community metrics
-        unique_authors = len(set(issue.author for issue in issues))
-        total_comments = sum(issue.comments_count for issue in issues)
-        highly_engaged_issues = [i for i in issues if i.comments_count > 5]
-        
-        # Author activity distribution
-        author_counts = {}
-        for issue in issues:
-            author_counts[issue.author] = author_counts.get(issue.author, 0) + 1
+        unique_authors = len(stats.author_counts)
+        total_comments = stats.comments_sum
         
         # Find power users vs occasional contributors
-        sorted_authors = sorted(author_counts.items(), key=lambda x: x[1], reverse=True)
-        power_users = [author for author, count in sorted_authors[:5] if count > 3]
-        
-        community_prompt = f"""
-        Analyze community engagement and health:
-        
-        Community Metrics:
-        - Unique Contributors: {unique_authors}
-        - Total Comments: {total_comments}
-        - Highly Engaged Issues (>5 comments): {len(highly_engaged_issues)}
-        - Power Users (>3 issues): {len(power_users)}
-        - Average Comments per Issue: {total_comments / len(issues) if issues else 0:.1f}
-        
-        Top Contributors:
-        {chr(10).join([f"- {author}: {count} issues" for author, count in sorted_authors[:5]])}
-        
-        Provide insights on:
-        1. Community health score (1-10)
-        2. Engagement patterns
-        3. Contributor diversity
-        4. Community growth opportunities
-        
-        Format as JSON with keys: health_score, engagement_level, diversity_assessment, growth_opportunities
-        """
+        sorted_authors = stats.author_counts.most_common(5)
+        power_users = [author for author, count in sorted_authors if count > 3]
+        
+        community_prompt = COMMUNITY_PROMPT.format_map({
+            "unique_authors": unique_authors,
+            "total_comments": total_comments,
+            "highly_engaged_count": stats.highly_engaged_count,
+            "power_users": len(power_users),
+            "avg_comments": stats.avg_comments,
+            "top_contributors": "\n".join(f"- {author}: {count} issues" for author, count in sorted_authors)
+        })
         
-        try:
-            response = await self.llm.ainvoke([
-                SystemMessage(content="You are a community manager analyzing open source project health."),
-                HumanMessage(content=community_prompt)
-            ])
-            
-            return json.loads(response.content)
-            
-        except Exception as e:
-            return {
-                "health_score": min(10, unique_authors / 10),
-                "engagement_level": "high" if total_comments / len(issues) > 3 else "medium" if total_comments / len(issues) > 1 else "low",
-                "diversity_assessment": "good" if unique_authors > len(issues) * 0.5 else "needs improvement",
-                "growth_opportunities": ["Improve documentation", "Add contributor guidelines"],
-                "error": str(e)
-            }
+        return community_prompt, {
+            "health_score": min(10, unique_authors / 10),
+            "engagement_level": "high" if stats.avg_comments > 3 else "medium" if stats.avg_comments > 1 else "low",
+            "diversity_assessment": "good" if unique_authors > stats.total * 0.5 else "needs improvement",
+            "growth_opportunities": ["Improve documentation", "Add contributor guidelines"]
+        }
     
-    async def _generate_strategic_insights(self, issues: List[GitHubIssue], trend_analysis: TrendAnalysis, memory: Any) -> Dict[str, Any]:
-        """Generate high-level strategic insights and recommendations."""
-        
-        # Analyze issue labels for feature requests vs bugs
-        feature_issues = [i for i in issues if any('feature' in label.lower() or 'enhancement' in label.lower() for label in i.labels)]
-        bug_issues = [i for i in issues if any('bug' in label.lower() or 'error' in label.lower() for label in i.labels)]
+    def _strategic_section(self, stats: IssueStats, trend_analysis: TrendAnalysis) -> Tuple[str, Dict[str, Any]]:
+        """Build the strategic recommendations prompt section and its fallback."""
         
         # Recent trends
-        recent_issues = [i for i in issues if (datetime.now() - i.created_at).days <= 30]
-        growth_rate = len(recent_issues) / 30 * 365 if recent_issues else 0  # Annualized
-        
-        # Historical context from memory
-        historical_patterns = memory.learned_patterns.get("strategic_insights", [])
-        
-        strategic_prompt = f"""
-        Generate strategic insights for repository management:
-        
-        Strategic Context:
-        - Total Issues Analyzed: {len(issues)}
-        - Feature Requests: {len(feature_issues)} ({len(feature_issues)/len(issues)*100:.1f}%)
-        - Bug Reports: {len(bug_issues)} ({len(bug_issues)/len(issues)*100:.1f}%)
-        - Recent Activity (30 days): {len(recent_issues)} issues
-        - Annualized Growth Rate: {growth_rate:.1f} issues/year
-        - Trend Direction: {trend_analysis.trend_direction}
-        - Analysis Confidence: {trend_analysis.confidence_score:.2f}
-        
-        Anomalies Detected: {len(trend_analysis.anomalies)}
-        
-        Provide strategic analysis on:
-        1. Resource allocation priorities
-        2. Product roadmap implications
-        3. Team scaling recommendations
-        4. Process improvement opportunities
-        5. Risk mitigation strategies
-        
-        Format as JSON with keys: priorities, roadmap_impact, scaling_advice, process_improvements, risk_mitigation
-        """
+        growth_rate = stats.recent_count / 30 * 365  # Annualized
+        
+        strategic_prompt = STRATEGIC_PROMPT.format_map({
+            "total_issues": stats.total,
+            "feature_count": stats.feature_count,
+            "feature_ratio": stats.feature_ratio,
+            "bug_count": stats.bug_count,
+            "bug_ratio": stats.bug_ratio,
+            "recent_issues": stats.recent_count,
+            "growth_rate": growth_rate,
+            "trend_direction": trend_analysis.trend_direction,
+            "confidence_score": trend_analysis.confidence_score,
+            "anomalies": len(trend_analysis.anomalies)
+        })
         
-        try:
-            response = await self.llm.ainvoke([
-                SystemMessage(content="You are a senior engineering manager providing strategic guidance."),
-                HumanMessage(content=strategic_prompt)
-            ])
-            
-            strategic_data = json.loads(response.content)
-            
-            # Add context from memory if available
-            if historical_patterns:
-                strategic_data["historical_context"] = historical_patterns[-3:]  # Last 3 analyses
-            
-            return strategic_data
-            
-        except Exception as e:
-            return {
-                "priorities": ["Address backlog", "Improve issue triage"],
-                "roadmap_impact": "Consider feature request backlog in planning",
-                "scaling_advice": "Monitor issue velocity trends",
-                "process_improvements": ["Implement better labeling", "Automate common responses"],
-                "risk_mitigation": ["Regular backlog review", "Community engagement"],
-                "error": str(e)
-            }
+        return strategic_prompt, {
+            "priorities": ["Address backlog", "Improve issue triage"],
+            "roadmap_impact": "Consider feature request backlog in planning",
+            "scaling_advice": "Monitor issue velocity trends",
+            "process_improvements": ["Implement better labeling", "Automate common responses"],
+            "risk_mitigation": ["Regular backlog review", "Community engagement"]
+        }
     
-    async def _assess_risks_and_opportunities(self, issues: List[GitHubIssue], trend_analysis: TrendAnalysis) -> Dict[str, Any]:
-        """Assess risks and opportunities based on the analysis."""
+    def _risk_section(self, stats: IssueStats, trend_analysis: TrendAnalysis) -> Tuple[str, Dict[str, Any]]:
+        """Build the risk and opportunity prompt section and its fallback."""
         
         # Risk indicators
         risk_factors = []
         
         # High volume of open issues
-        open_issues = len([i for i in issues if i.state == "open"])
-        if open_issues > len(issues) * 0.7:
+        open_issues = stats.open_count
+        if open_issues > stats.total * 0.7:
             risk_factors.append("high_open_issue_ratio")
         
         # Increasing trend
@@ -343,54 +567,33 @@ class InsightGenerationAgent:
             risk_factors.append("rapid_issue_growth")
         
         # Low engagement
-        avg_comments = sum(i.comments_count for i in issues) / len(issues) if issues else 0
-        if avg_comments < 1:
+        if stats.avg_comments < 1:
             risk_factors.append("low_community_engagement")
         
         # Security-related issues
-        security_issues = [i for i in issues if any('security' in label.lower() or 'vulnerability' in label.lower() for label in i.labels)]
-        if security_issues:
+        if stats.security_count:
             risk_factors.append("security_concerns")
         
-        risk_prompt = f"""
-        Assess risks and opportunities for this repository:
-        
-        Risk Indicators:
-        - Identified Risk Factors: {', '.join(risk_factors)}
-        - Open Issues: {open_issues}/{len(issues)}
-        - Trend: {trend_analysis.trend_direction} (slope: {trend_analysis.trend_slope:.2f})
-        - Security Issues: {len(security_issues)}
-        - Anomalies: {len(trend_analysis.anomalies)}
-        - Analysis Confidence: {trend_analysis.confidence_score:.2f}
-        
-        Provide assessment with:
-        1. Overall risk level (low/medium/high)
-        2. Top 3 risks with impact assessment
-        3. Top 3 opportunities for improvement
-        4. Recommended actions
+        risk_prompt = RISK_PROMPT.format_map({
+            "risk_factors": ", ".join(risk_factors),
+            "open_issues": open_issues,
+            "total_issues": stats.total,
+            "trend_direction": trend_analysis.trend_direction,
+            "trend_slope": trend_analysis.trend_slope,
+            "security_count": stats.security_count,
+            "anomalies": len(trend_analysis.anomalies),
+            "confidence_score": trend_analysis.confidence_score
+        })
         
-        Format as JSON with keys: overall_risk, top_risks, opportunities, recommended_actions
-        """
+        # Fallback risk assessment
+        risk_level = "high" if len(risk_factors) > 2 else "medium" if len(risk_factors) > 0 else "low"
         
-        try:
-            response = await self.llm.ainvoke([
-                SystemMessage(content="You are a risk assessment expert for software projects."),
-                HumanMessage(content=risk_prompt)
-            ])
-            
-            return json.loads(response.content)
-            
-        except Exception as e:
-            # Fallback risk assessment
-            risk_level = "high" if len(risk_factors) > 2 else "medium" if len(risk_factors) > 0 else "low"
-            
-            return {
-                "overall_risk": risk_level,
-                "top_risks": risk_factors[:3],
-                "opportunities": ["Improve automation", "Enhance community engagement", "Better documentation"],
-                "recommended_actions": ["Regular monitoring", "Process improvements", "Community outreach"],
-                "error": str(e)
-            }
+        return risk_prompt, {
+            "overall_risk": risk_level,
+            "top_risks": risk_factors[:3],
+            "opportunities": ["Improve automation", "Enhance community engagement", "Better documentation"],
+            "recommended_actions": ["Regular monitoring", "Process improvements", "Community outreach"]
+        }
     
     async def _add_structured_insights_to_state(self, state: WorkflowState, insights: Dict[str, Any]):
         """Add insights to state in structured format."""
@@ -438,14 +641,19 @@ class InsightGenerationAgent:
                 confidence=0.9
             )
     
-    def _update_agent_memory(self, memory: Any, insights: Dict[str, Any], repo_url: str):
+    def _update_agent_memory(self, memory: Any, insights: Dict[str, Any], repo_url: str, now: datetime):
         """Update agent memory with insight patterns."""
         
-        # Store strategic insights for future reference
-        strategic_insights = memory.learned_patterns.get("strategic_insights", [])
+        # Store strategic insights for future reference, keeping only the last 20 analyses
+        strategic_insights = memory.learned_patterns.get("strategic_insights")
+        if not isinstance(strategic_insights, deque) or strategic_insights.maxlen != STRATEGIC_HISTORY_SIZE:
+            # Older memories (or ones restored from a checkpoint) hold a plain sequence
+            strategic_insights = deque(strategic_insights or (), maxlen=STRATEGIC_HISTORY_SIZE)
+            memory.learned_patterns["strategic_insights"] = strategic_insights
+        
         strategic_insights.append({
             "repository": repo_url,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
             "insights_summary": {
                 "health_score": insights.get("health", {}).get("health_score"),
                 "maintenance_load": insights.get("maintenance", {}).get("load_assessment"),
@@ -454,10 +662,7 @@ class InsightGenerationAgent:
             }
         })
         
-        # Keep only last 20 analyses
-        memory.learned_patterns["strategic_insights"] = strategic_insights[-20:]
-        
         # Update performance metrics
-        memory.performance_metrics["insights_generated"] = memory.performance_metrics.get("insights_generated", 0) + 1
-        memory.last_updated = datetime.now()
+        memory.performance_metrics["insights_generated"] += 1
+        memory.last_updated = now
 
@@ -3,14 +3,183 @@ Report Generation Agent - Creates comprehensive, structured reports.
 Synthesizes all analysis results into actionable reports for different audiences.
 """
 
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+from typing import Dict, Any, List, Tuple
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from operator import itemgetter
+import asyncio
 import json
 
+# orjson encodes the prompt's insight blocks and parses the LLM response several times faster
+try:
+    import orjson
+    _json_loads = orjson.loads
+    
+    def _json_dumps_indented(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY).decode()
+except ImportError:
+    _json_loads = json.loads
+    
+    def _json_dumps_indented(obj: Any) -> str:
+        return json.dumps(obj, indent=2)
+
+import httpx
+import openai
 from langchain_openai import ChatOpenAI
-from langchain.schema import HumanMessage, SystemMessage
+from langchain_core.prompts import ChatPromptTemplate
+
+from ..core.state import WorkflowState, AgentStatus, TrendAnalysis, GitHubIssue
+from ..core.llm_cache import CachedChatLLM
+
+
+# Persona, section instructions and output schema form a stable, cacheable prefix;
+# only the per-repository data in the human message varies between analyses
+REPORT_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are a technology consultant writing repository analysis reports for three audiences: "
+               "leadership, data scientists and project managers.\n\n"
+               "Respond with one JSON object whose top-level keys are executive, technical, actionable; "
+               "each value is an object with the keys listed for that report.\n\n"
+               "## executive\n"
+               "An executive summary with:\n"
+               "1. One-sentence overall assessment\n"
+               "2. Key findings (3-4 bullet points)\n"
+               "3. Business impact analysis\n"
+               "4. Top 3 recommendations\n"
+               "5. Resource requirements\n"
+               "Keep it concise and business-focused. Use clear, non-technical language.\n"
+               "Keys: overview, key_findings, business_impact, recommendations, resources_needed\n\n"
+               "## technical\n"
+               "A detailed technical analysis report with:\n"
+               "1. Methodology explanation\n"
+               "2. Statistical analysis results\n"
+               "3. Pattern identification\n"
+               "4. Technical recommendations\n"
+               "5. Implementation guidance\n"
+               "Keys: methodology, statistical_analysis, patterns_identified, technical_recommendations, implementation_guide\n\n"
+               "## actionable\n"
+               "A structured action plan built from the identified action items with:\n"
+               "1. Immediate actions (next 7 days)\n"
+               "2. Short-term actions (next 30 days)\n"
+               "3. Long-term actions (next 90 days)\n"
+               "4. Resource requirements for each\n"
+               "5. Success metrics\n"
+               "Keys: immediate_actions, short_term_actions, long_term_actions, resource_requirements, success_metrics"),
+    ("human", "Repository: {repository}\n"
+              "Analysis Period: {analysis_period_days} days\n\n"
+              "Key Metrics:\n"
+              "- Total Issues: {total_issues}\n"
+              "- Open Issues: {open_issues} ({open_ratio:.1%})\n"
+              "- Recent Activity: {recent_issues} issues in last 30 days\n"
+              "- Health Score: {health_score}/10\n"
+              "- Risk Level: {risk_level}\n"
+              "- Repository Stars: {stars}\n\n"
+              "Trend Analysis:\n"
+              "- Direction: {trend_direction}\n"
+              "- Slope: {trend_slope}\n"
+              "- Confidence: {confidence_score:.2f}\n"
+              "- Analysis Period: {analysis_period}\n\n"
+              "Anomalies Detected: {anomalies}\n"
+              "Seasonal Patterns: {has_seasonal_patterns}\n"
+              "Forecast Available: {has_forecast}\n\n"
+              "Maintenance Insights:\n{maintenance_insights}\n\n"
+              "Community Insights:\n{community_insights}\n\n"
+              "Action Items Identified:\n{action_items}")
+])
 
-from ..core.state import WorkflowState, AgentStatus, TrendAnalysis
+# Top-level keys of the combined response, one per narrative report
+NARRATIVE_REPORTS = ("executive", "technical", "actionable")
+
+# Insight fields the reports draw on; anything else (errors, history) is left out of the prompt
+MAINTENANCE_PROMPT_KEYS = ("load_assessment", "debt_score", "recommendations", "priority_areas")
+COMMUNITY_PROMPT_KEYS = ("health_score", "engagement_level", "diversity_assessment", "growth_opportunities")
+MAX_PROMPT_VALUE_CHARS = 500
+MAX_PROMPT_LIST_ITEMS = 5
+
+# The action plan prompt sees at most this many distinct action items, most urgent first
+MAX_PROMPT_ACTION_ITEMS = 20
+ACTION_PRIORITY_ORDER = {"high": 0, "medium": 1, "low": 2}
+
+# Fields the final report copies out of each state recommendation and insight
+_RECOMMENDATION_FIELDS = itemgetter("agent_id", "recommendation", "priority", "rationale")
+_INSIGHT_FIELDS = itemgetter("agent_id", "type", "content", "confidence")
+
+
+def _prompt_action_items(action_items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Deduplicate action items by action and keep the highest-priority ones for the prompt."""
+    unique = {}
+    for item in sorted(action_items, key=lambda item: ACTION_PRIORITY_ORDER.get(item["priority"], len(ACTION_PRIORITY_ORDER))):
+        unique.setdefault(str(item["action"]), item)
+    return list(unique.values())[:MAX_PROMPT_ACTION_ITEMS]
+
+
+def _compact_insight(insight: Dict[str, Any], keys: Tuple[str, ...]) -> Dict[str, Any]:
+    """Keep only the listed insight fields, with long strings and lists cut down for the prompt."""
+    def compact(value: Any) -> Any:
+        if isinstance(value, str):
+            return value[:MAX_PROMPT_VALUE_CHARS]
+        if isinstance(value, list):
+            return [compact(item) for item in value[:MAX_PROMPT_LIST_ITEMS]]
+        return value
+    
+    return {key: compact(insight[key]) for key in keys if key in insight}
+
+
+def _object_schema(**properties) -> Dict[str, Any]:
+    """Strict JSON schema object that requires every listed property."""
+    return {"type": "object", "properties": properties, "required": list(properties), "additionalProperties": False}
+
+
+_STRING = {"type": "string"}
+_STRING_LIST = {"type": "array", "items": _STRING}
+
+# Structured output makes the model return JSON matching this schema, so a completed call always parses
+REPORT_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "repository_reports",
+        "strict": True,
+        "schema": _object_schema(
+            executive=_object_schema(
+                overview=_STRING,
+                key_findings=_STRING_LIST,
+                business_impact=_STRING,
+                recommendations=_STRING_LIST,
+                resources_needed=_STRING
+            ),
+            technical=_object_schema(
+                methodology=_STRING,
+                statistical_analysis=_object_schema(
+                    trend_direction=_STRING,
+                    confidence_score={"type": "number"},
+                    anomalies_detected={"type": "integer"},
+                    summary=_STRING
+                ),
+                patterns_identified=_STRING_LIST,
+                technical_recommendations=_STRING_LIST,
+                implementation_guide=_STRING
+            ),
+            actionable=_object_schema(
+                immediate_actions=_STRING_LIST,
+                short_term_actions=_STRING_LIST,
+                long_term_actions=_STRING_LIST,
+                resource_requirements=_STRING,
+                success_metrics=_STRING_LIST
+            )
+        )
+    }
+}
+
+
+@dataclass
+class ReportContext:
+    """Repository figures shared by every report, computed once per run."""
+    total_issues: int
+    open_issues: int
+    recent_issues: int
+    ai_insights: Dict[str, Any]
+    repo_metadata: Dict[str, Any]
+    now: datetime
 
 
 class ReportGenerationAgent:
@@ -19,7 +188,8 @@ class ReportGenerationAgent:
     """
     
     def __init__(self, llm: ChatOpenAI):
-        self.llm = llm
+        # Re-analysing a repository renders the same prompts; reuse their responses
+        self.llm = CachedChatLLM(llm) if llm is not None else None
         self.agent_id = "report_agent"
         self.report_templates = {
             "executive": "executive_summary_template",
@@ -40,45 +210,42 @@ class ReportGenerationAgent:
                                         error="Missing required data for report generation")
                 return state
             
-            # Generate multiple report formats
-            reports = {}
-            
-            # 1. Executive Summary
-            state.update_progress("report_generation", 25.0, "Creating executive summary...")
-            reports["executive"] = await self._generate_executive_summary(state)
-            
-            # 2. Technical Analysis Report
-            state.update_progress("report_generation", 45.0, "Generating technical analysis...")
-            reports["technical"] = await self._generate_technical_report(state)
+            ctx = self._build_context(state)
             
-            # 3. Action Items Report
-            state.update_progress("report_generation", 65.0, "Compiling action items...")
-            reports["actionable"] = await self._generate_action_items_report(state)
+            # One LLM call writes every narrative report while the dashboard data is computed locally
+            state.update_progress("report_generation", 25.0, "Creating executive summary, technical analysis, action items and dashboard data...")
+            narratives, dashboard = await asyncio.gather(
+                self._generate_narrative_reports(state, ctx),
+                self._generate_dashboard_data(state, ctx),
+                return_exceptions=True
+            )
+            if isinstance(narratives, BaseException):
+                raise narratives
             
-            # 4. Dashboard Data
-            state.update_progress("report_generation", 80.0, "Preparing dashboard data...")
-            reports["dashboard"] = await self._generate_dashboard_data(state)
+            reports = {
+                **narratives,
+                # Keep the narrative reports even if the dashboard can't be built
+                "dashboard": {"error": str(dashboard)} if isinstance(dashboard, BaseException) else dashboard
+            }
             
-            # 5. Comprehensive Final Report
+            # Comprehensive Final Report
             state.update_progress("report_generation", 90.0, "Assembling final report...")
-            final_report = await self._generate_final_report(state, reports)
+            final_report = await self._generate_final_report(state, reports, ctx)
             
-            # Store all reports in state
+            # The final report holds every format; nothing else needs its own copy
             state.final_report = final_report
-            state.processed_data["all_reports"] = reports
             
-            # Generate metadata about the reports
-            report_metadata = {
-                "generated_at": datetime.now().isoformat(),
-                "repository": state.repository_url,
-                "analysis_period": state.analysis_period_days,
-                "total_issues_analyzed": len(state.raw_issues),
-                "report_formats": list(reports.keys()),
-                "confidence_score": state.trend_analysis.confidence_score if state.trend_analysis else 0
+            # Metadata about the reports, mostly shared with the final report's own
+            metadata = final_report["metadata"]
+            state.processed_data["report_metadata"] = {
+                "generated_at": metadata["analysis_date"],
+                "repository": metadata["repository"],
+                "analysis_period": metadata["analysis_period_days"],
+                "total_issues_analyzed": metadata["total_issues_analyzed"],
+                "report_formats": list(reports),
+                "confidence_score": metadata["confidence_score"]
             }
             
-            state.processed_data["report_metadata"] = report_metadata
-            
             state.update_progress("report_generation", 100.0, "Report generation completed")
             state.update_agent_status(self.agent_id, AgentStatus.COMPLETED, output={
                 "reports_generated": list(reports.keys()),
@@ -92,154 +259,99 @@ class ReportGenerationAgent:
         
         return state
     
-    async def _generate_executive_summary(self, state: WorkflowState) -> Dict[str, Any]:
-        """Generate executive summary for leadership."""
+    def _build_context(self, state: WorkflowState) -> ReportContext:
+        """Collect the issue counts and upstream results every report draws on."""
+        now = datetime.now()
+        issues = state.raw_issues
+        # Created within the last 30 whole days, i.e. (now - created_at).days <= 30
+        recent_cutoff = now - timedelta(days=31)
+        return ReportContext(
+            total_issues=len(issues),
+            open_issues=sum(1 for i in issues if i.state == "open"),
+            recent_issues=sum(1 for i in issues if i.created_at > recent_cutoff),
+            ai_insights=state.processed_data.get("ai_insights", {}),
+            repo_metadata=state.processed_data.get("repository_metadata", {}),
+            now=now
+        )
+    
+    async def _generate_narrative_reports(self, state: WorkflowState, ctx: ReportContext) -> Dict[str, Dict[str, Any]]:
+        """Generate the executive, technical and action reports from a single LLM call."""
         
         trend_analysis = state.trend_analysis
-        insights = state.insights
-        issues = state.raw_issues
-        repo_metadata = state.processed_data.get("repository_metadata", {})
+        repo_metadata = ctx.repo_metadata
+        ai_insights = ctx.ai_insights
         
         # Prepare summary data
-        total_issues = len(issues)
-        open_issues = len([i for i in issues if i.state == "open"])
-        recent_issues = len([i for i in issues if (datetime.now() - i.created_at).days <= 30])
-        
-        ai_insights = state.processed_data.get("ai_insights", {})
+        total_issues = ctx.total_issues
+        open_issues = ctx.open_issues
+        recent_issues = ctx.recent_issues
         health_score = ai_insights.get("health", {}).get("health_score", "unknown")
         risk_level = ai_insights.get("risks", {}).get("overall_risk", "unknown")
+        action_items = self._collect_action_items(state, ai_insights)
         
-        exec_prompt = f"""
-        Generate an executive summary for repository analysis:
-        
-        Repository: {repo_metadata.get('full_name', state.repository_url)}
-        Analysis Period: {state.analysis_period_days} days
-        
-        Key Metrics:
-        - Total Issues: {total_issues}
-        - Open Issues: {open_issues} ({open_issues/total_issues*100:.1f}% if total_issues > 0 else 0)
-        - Recent Activity: {recent_issues} issues in last 30 days
-        - Trend Direction: {trend_analysis.trend_direction}
-        - Health Score: {health_score}/10
-        - Risk Level: {risk_level}
-        - Repository Stars: {repo_metadata.get('stars', 'N/A')}
-        
-        Create an executive summary with:
-        1. One-sentence overall assessment
-        2. Key findings (3-4 bullet points)
-        3. Business impact analysis
-        4. Top 3 recommendations
-        5. Resource requirements
-        
-        Keep it concise and business-focused. Use clear, non-technical language.
-        Format as JSON with keys: overview, key_findings, business_impact, recommendations, resources_needed
-        """
-        
-        try:
-            response = await self.llm.ainvoke([
-                SystemMessage(content="You are an executive consultant providing strategic technology assessments."),
-                HumanMessage(content=exec_prompt)
-            ])
-            
-            return json.loads(response.content)
-            
-        except Exception as e:
-            return {
-                "overview": f"Analysis of {repo_metadata.get('full_name', 'repository')} shows {trend_analysis.trend_direction} issue trends.",
-                "key_findings": [
-                    f"Repository has {total_issues} total issues with {open_issues} currently open",
-                    f"Issue trend is {trend_analysis.trend_direction}",
-                    f"Health score assessed at {health_score}/10"
-                ],
-                "business_impact": "Repository health impacts development velocity and user satisfaction.",
-                "recommendations": ["Monitor issue trends", "Improve response times", "Enhance documentation"],
-                "resources_needed": "Development team attention for issue triage and resolution",
-                "error": str(e)
-            }
-    
-    async def _generate_technical_report(self, state: WorkflowState) -> Dict[str, Any]:
-        """Generate detailed technical analysis report."""
-        
-        trend_analysis = state.trend_analysis
-        ai_insights = state.processed_data.get("ai_insights", {})
-        
-        # Extract technical details
-        anomalies = trend_analysis.anomalies if trend_analysis else []
-        seasonal_patterns = trend_analysis.seasonal_patterns if trend_analysis else {}
-        forecast = trend_analysis.forecast if trend_analysis else {}
-        
-        tech_prompt = f"""
-        Generate a detailed technical analysis report:
-        
-        Trend Analysis:
-        - Direction: {trend_analysis.trend_direction if trend_analysis else 'unknown'}
-        - Slope: {trend_analysis.trend_slope if trend_analysis else 0}
-        - Confidence: {trend_analysis.confidence_score if trend_analysis else 0:.2f}
-        - Analysis Period: {trend_analysis.analysis_period if trend_analysis else 'unknown'}
-        
-        Anomalies Detected: {len(anomalies)}
-        Seasonal Patterns: {bool(seasonal_patterns)}
-        Forecast Available: {bool(forecast)}
-        
-        Maintenance Insights:
-        {json.dumps(ai_insights.get('maintenance', {}), indent=2)}
-        
-        Community Insights:
-        {json.dumps(ai_insights.get('community', {}), indent=2)}
-        
-        Create a technical report with:
-        1. Methodology explanation
-        2. Statistical analysis results
-        3. Pattern identification
-        4. Technical recommendations
-        5. Implementation guidance
+        fallbacks = {
+            "executive": self._executive_fallback(state, ctx, health_score),
+            "technical": self._technical_fallback(trend_analysis),
+            "actionable": self._actionable_fallback()
+        }
         
-        Format as JSON with keys: methodology, statistical_analysis, patterns_identified, technical_recommendations, implementation_guide
-        """
+        if self.llm is None:
+            # No model configured; skip rendering the prompt and use the templated reports
+            reports = fallbacks
+        else:
+            try:
+                messages = REPORT_PROMPT.format_messages(
+                    repository=repo_metadata.get('full_name', state.repository_url),
+                    analysis_period_days=state.analysis_period_days,
+                    total_issues=total_issues,
+                    open_issues=open_issues,
+                    open_ratio=open_issues / total_issues if total_issues > 0 else 0,
+                    recent_issues=recent_issues,
+                    health_score=health_score,
+                    risk_level=risk_level,
+                    stars=repo_metadata.get('stars', 'N/A'),
+                    trend_direction=trend_analysis.trend_direction,
+                    trend_slope=trend_analysis.trend_slope,
+                    confidence_score=trend_analysis.confidence_score,
+                    analysis_period=trend_analysis.analysis_period,
+                    anomalies=len(trend_analysis.anomalies),
+                    has_seasonal_patterns=bool(trend_analysis.seasonal_patterns),
+                    has_forecast=bool(trend_analysis.forecast),
+                    maintenance_insights=_json_dumps_indented(_compact_insight(ai_insights.get('maintenance', {}), MAINTENANCE_PROMPT_KEYS)),
+                    community_insights=_json_dumps_indented(_compact_insight(ai_insights.get('community', {}), COMMUNITY_PROMPT_KEYS)),
+                    action_items=_json_dumps_indented(_prompt_action_items(action_items))
+                )
+                response = await self.llm.ainvoke(messages, response_format=REPORT_RESPONSE_FORMAT)
+                
+                combined = _json_loads(response.content)
+                reports = {report_type: combined[report_type] for report_type in NARRATIVE_REPORTS}
+                # Cache only a completion that produced every report
+                self.llm.store(messages, response, response_format=REPORT_RESPONSE_FORMAT)
+                
+            except (openai.APIError, httpx.HTTPError, asyncio.TimeoutError, ValueError, KeyError) as e:
+                # API and mid-stream transport failures, or a completion refused or cut off before the schema closed
+                error = f"Response had no '{e.args[0]}' report" if isinstance(e, KeyError) else str(e)
+                reports = {report_type: {**fallbacks[report_type], "error": error} for report_type in NARRATIVE_REPORTS}
+        
+        # Add raw data references
+        reports["technical"]["data_summary"] = {
+            "total_issues_analyzed": total_issues,
+            "analysis_confidence": trend_analysis.confidence_score,
+            "anomalies_count": len(trend_analysis.anomalies),
+            "trend_slope": trend_analysis.trend_slope
+        }
+        reports["actionable"]["all_action_items"] = action_items
         
-        try:
-            response = await self.llm.ainvoke([
-                SystemMessage(content="You are a senior data scientist creating technical analysis reports."),
-                HumanMessage(content=tech_prompt)
-            ])
-            
-            technical_report = json.loads(response.content)
-            
-            # Add raw data references
-            technical_report["data_summary"] = {
-                "total_issues_analyzed": len(state.raw_issues),
-                "analysis_confidence": trend_analysis.confidence_score if trend_analysis else 0,
-                "anomalies_count": len(anomalies),
-                "trend_slope": trend_analysis.trend_slope if trend_analysis else 0
-            }
-            
-            return technical_report
-            
-        except Exception as e:
-            return {
-                "methodology": "Time-series analysis of GitHub issues using statistical modeling",
-                "statistical_analysis": {
-                    "trend_direction": trend_analysis.trend_direction if trend_analysis else "unknown",
-                    "confidence_score": trend_analysis.confidence_score if trend_analysis else 0,
-                    "anomalies_detected": len(anomalies)
-                },
-                "patterns_identified": ["Weekly patterns in issue creation", "Maintenance issue clustering"],
-                "technical_recommendations": ["Implement automated issue labeling", "Set up monitoring dashboards"],
-                "implementation_guide": "Use CI/CD integration for automated analysis",
-                "error": str(e)
-            }
+        return reports
     
-    async def _generate_action_items_report(self, state: WorkflowState) -> Dict[str, Any]:
-        """Generate actionable recommendations with priorities."""
-        
-        recommendations = state.recommendations
-        ai_insights = state.processed_data.get("ai_insights", {})
+    def _collect_action_items(self, state: WorkflowState, ai_insights: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Gather actionable recommendations with priorities from every source."""
         
         # Extract actionable items from various sources
         action_items = []
         
         # From explicit recommendations
-        for rec in recommendations:
+        for rec in state.recommendations:
             action_items.append({
                 "action": rec["recommendation"],
                 "priority": rec["priority"],
@@ -272,108 +384,87 @@ class ReportGenerationAgent:
                     "category": "risk_mitigation"
                 })
         
-        action_prompt = f"""
-        Create an actionable report from these recommendations:
-        
-        Action Items Identified:
-        {json.dumps(action_items, indent=2)}
-        
-        Repository Context:
-        - Issues Analyzed: {len(state.raw_issues)}
-        - Trend: {state.trend_analysis.trend_direction if state.trend_analysis else 'unknown'}
-        - Risk Level: {ai_insights.get('risks', {}).get('overall_risk', 'unknown')}
-        
-        Create structured action plan with:
-        1. Immediate actions (next 7 days)
-        2. Short-term actions (next 30 days)  
-        3. Long-term actions (next 90 days)
-        4. Resource requirements for each
-        5. Success metrics
-        
-        Format as JSON with keys: immediate_actions, short_term_actions, long_term_actions, resource_requirements, success_metrics
-        """
-        
-        try:
-            response = await self.llm.ainvoke([
-                SystemMessage(content="You are a project manager creating actionable implementation plans."),
-                HumanMessage(content=action_prompt)
-            ])
-            
-            action_report = json.loads(response.content)
-            action_report["all_action_items"] = action_items
-            
-            return action_report
-            
-        except Exception as e:
-            # Fallback action items
-            return {
-                "immediate_actions": [
-                    "Review open issues older than 90 days",
-                    "Implement issue labeling strategy"
-                ],
-                "short_term_actions": [
-                    "Set up automated issue triage",
-                    "Establish response time targets"
-                ],
-                "long_term_actions": [
-                    "Implement comprehensive monitoring",
-                    "Develop community engagement strategy"
-                ],
-                "resource_requirements": "2-3 hours per week for issue management",
-                "success_metrics": ["Reduced average issue resolution time", "Improved community engagement"],
-                "all_action_items": action_items,
-                "error": str(e)
-            }
+        return action_items
+    
+    def _executive_fallback(self, state: WorkflowState, ctx: ReportContext, health_score: Any) -> Dict[str, Any]:
+        """Templated executive summary used when the LLM report is unavailable."""
+        trend_direction = state.trend_analysis.trend_direction
+        repo_name = ctx.repo_metadata.get('full_name', 'repository')
+        return {
+            "overview": f"Analysis of {repo_name} shows {trend_direction} issue trends.",
+            "key_findings": [
+                f"Repository has {ctx.total_issues} total issues with {ctx.open_issues} currently open",
+                f"Issue trend is {trend_direction}",
+                f"Health score assessed at {health_score}/10"
+            ],
+            "business_impact": "Repository health impacts development velocity and user satisfaction.",
+            "recommendations": ["Monitor issue trends", "Improve response times", "Enhance documentation"],
+            "resources_needed": "Development team attention for issue triage and resolution"
+        }
+    
+    def _technical_fallback(self, trend_analysis: TrendAnalysis) -> Dict[str, Any]:
+        """Templated technical report used when the LLM report is unavailable."""
+        return {
+            "methodology": "Time-series analysis of GitHub issues using statistical modeling",
+            "statistical_analysis": {
+                "trend_direction": trend_analysis.trend_direction,
+                "confidence_score": trend_analysis.confidence_score,
+                "anomalies_detected": len(trend_analysis.anomalies)
+            },
+            "patterns_identified": ["Weekly patterns in issue creation", "Maintenance issue clustering"],
+            "technical_recommendations": ["Implement automated issue labeling", "Set up monitoring dashboards"],
+            "implementation_guide": "Use CI/CD integration for automated analysis"
+        }
     
-    async def _generate_dashboard_data(self, state: WorkflowState) -> Dict[str, Any]:
+    def _actionable_fallback(self) -> Dict[str, Any]:
+        """Templated action plan used when the LLM report is unavailable."""
+        return {
+            "immediate_actions": [
+                "Review open issues older than 90 days",
+                "Implement issue labeling strategy"
+            ],
+            "short_term_actions": [
+                "Set up automated issue triage",
+                "Establish response time targets"
+            ],
+            "long_term_actions": [
+                "Implement comprehensive monitoring",
+                "Develop community engagement strategy"
+            ],
+            "resource_requirements": "2-3 hours per week for issue management",
+            "success_metrics": ["Reduced average issue resolution time", "Improved community engagement"]
+        }
+    
+    async def _generate_dashboard_data(self, state: WorkflowState, ctx: ReportContext) -> Dict[str, Any]:
         """Generate data formatted for dashboard visualization."""
         
-        issues = state.raw_issues
         trend_analysis = state.trend_analysis
         
-        # Prepare time series data
-        import pandas as pd
-        
-        # Daily issue counts
-        df = pd.DataFrame([{
-            'date': issue.created_at.strftime('%Y-%m-%d'),
-            'created': 1,
-            'state': issue.state,
-            'labels': issue.labels,
-            'comments': issue.comments_count
-        } for issue in issues])
+        # The per-issue pass is plain CPU work; keep it off the event loop
+        daily_counts, state_counts, label_counter = await asyncio.to_thread(self._count_issues, state.raw_issues)
         
-        daily_counts = df.groupby('date').size().to_dict()
+        # Monthly trends roll up the daily histogram by its YYYY-MM prefix
+        monthly_counts = Counter()
+        for day, count in daily_counts.items():
+            monthly_counts[day[:7]] += count
         
         # Labels distribution
-        all_labels = []
-        for issue in issues:
-            all_labels.extend(issue.labels)
-        
-        from collections import Counter
-        label_counts = dict(Counter(all_labels).most_common(10))
-        
-        # State distribution
-        state_counts = df['state'].value_counts().to_dict()
-        
-        # Monthly trends
-        df['month'] = pd.to_datetime(df['date']).dt.to_period('M').astype(str)
-        monthly_counts = df.groupby('month').size().to_dict()
+        label_counts = dict(label_counter.most_common(10))
         
         dashboard_data = {
             "summary_metrics": {
-                "total_issues": len(issues),
-                "open_issues": len([i for i in issues if i.state == "open"]),
+                "total_issues": ctx.total_issues,
+                "open_issues": ctx.open_issues,
                 "trend_direction": trend_analysis.trend_direction if trend_analysis else "unknown",
-                "health_score": state.processed_data.get("ai_insights", {}).get("health", {}).get("health_score", 0),
-                "risk_level": state.processed_data.get("ai_insights", {}).get("risks", {}).get("overall_risk", "unknown")
+                "health_score": ctx.ai_insights.get("health", {}).get("health_score", 0),
+                "risk_level": ctx.ai_insights.get("risks", {}).get("overall_risk", "unknown")
             },
             "time_series": {
-                "daily_issues": daily_counts,
-                "monthly_issues": monthly_counts
+                "daily_issues": dict(sorted(daily_counts.items())),
+                "monthly_issues": dict(sorted(monthly_counts.items()))
             },
             "distributions": {
-                "issue_states": state_counts,
+                "issue_states": dict(state_counts.most_common()),
                 "top_labels": label_counts
             },
             "trend_analysis": {
@@ -382,21 +473,31 @@ class ReportGenerationAgent:
                 "anomalies": len(trend_analysis.anomalies) if trend_analysis else 0
             },
             "forecast": trend_analysis.forecast if trend_analysis else {},
-            "generated_at": datetime.now().isoformat()
+            "generated_at": ctx.now.isoformat()
         }
         
         return dashboard_data
     
-    async def _generate_final_report(self, state: WorkflowState, reports: Dict[str, Any]) -> Dict[str, Any]:
+    def _count_issues(self, issues: List[GitHubIssue]) -> Tuple[Counter, Counter, Counter]:
+        """Count issues per creation day, state and label in a single pass."""
+        daily_counts, state_counts, label_counter = Counter(), Counter(), Counter()
+        for issue in issues:
+            daily_counts[issue.created_at.date().isoformat()] += 1
+            state_counts[issue.state] += 1
+            label_counter.update(issue.labels)
+        return daily_counts, state_counts, label_counter
+    
+    async def _generate_final_report(self, state: WorkflowState, reports: Dict[str, Any],
+                                     ctx: ReportContext) -> Dict[str, Any]:
         """Generate comprehensive final report combining all analyses."""
         
         # Structure the final report
         final_report = {
             "metadata": {
                 "repository": state.repository_url,
-                "analysis_date": datetime.now().isoformat(),
+                "analysis_date": ctx.now.isoformat(),
                 "analysis_period_days": state.analysis_period_days,
-                "total_issues_analyzed": len(state.raw_issues),
+                "total_issues_analyzed": ctx.total_issues,
                 "session_id": state.session_id,
                 "confidence_score": state.trend_analysis.confidence_score if state.trend_analysis else 0
             },
@@ -405,28 +506,18 @@ class ReportGenerationAgent:
             "action_plan": reports.get("actionable", {}),
             "dashboard_data": reports.get("dashboard", {}),
             "detailed_insights": {
-                "repository_health": state.processed_data.get("ai_insights", {}).get("health", {}),
-                "maintenance_analysis": state.processed_data.get("ai_insights", {}).get("maintenance", {}),
-                "community_assessment": state.processed_data.get("ai_insights", {}).get("community", {}),
-                "risk_evaluation": state.processed_data.get("ai_insights", {}).get("risks", {})
+                "repository_health": ctx.ai_insights.get("health", {}),
+                "maintenance_analysis": ctx.ai_insights.get("maintenance", {}),
+                "community_assessment": ctx.ai_insights.get("community", {}),
+                "risk_evaluation": ctx.ai_insights.get("risks", {})
             },
             "recommendations": [
-                {
-                    "category": rec["agent_id"],
-                    "recommendation": rec["recommendation"],
-                    "priority": rec["priority"],
-                    "rationale": rec.get("rationale", "")
-                }
-                for rec in state.recommendations
+                {"category": agent_id, "recommendation": recommendation, "priority": priority, "rationale": rationale}
+                for agent_id, recommendation, priority, rationale in map(_RECOMMENDATION_FIELDS, state.recommendations)
             ],
             "insights": [
-                {
-                    "source": insight["agent_id"],
-                    "type": insight["type"],
-                    "content": insight["content"],
-                    "confidence": insight["confidence"]
-                }
-                for insight in state.insights
+                {"source": agent_id, "type": insight_type, "content": content, "confidence": confidence}
+                for agent_id, insight_type, content, confidence in map(_INSIGHT_FIELDS, state.insights)
             ]
         }
         
@@ -5,19 +5,50 @@ Provides REST API and WebSocket endpoints for the multi-agent system.
 
 import os
 import asyncio
+import gzip
 import json
-from typing import Optional, AsyncGenerator
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from typing import Any, Optional
 from datetime import datetime
 
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, BackgroundTasks
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, Response
+from starlette.routing import WebSocketRoute
 from pydantic import BaseModel, Field
 import uvicorn
 
 from ..core.orchestrator import MultiAgentOrchestrator
 from ..core.state import WorkflowState
 
+# orjson encodes WebSocket messages, datetimes included, several times faster than the stdlib
+try:
+    import orjson
+    
+    def _dumps(data: Any) -> str:
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+except ImportError:
+    def _dumps(data: Any) -> str:
+        return json.dumps(data, default=lambda value: value.isoformat() if isinstance(value, datetime) else str(value))
+
+
+def _state_update_message(session_id: str, current_step: str, completion_percentage: float,
+                          agent_statuses_delta: dict, latest_progress: Optional[dict], timestamp: datetime) -> dict:
+    """Build the WebSocket envelope for a workflow state update."""
+    return {
+        "type": "state_update",
+        "session_id": session_id,
+        "current_step": current_step,
+        "completion_percentage": completion_percentage,
+        "agent_statuses_delta": agent_statuses_delta,
+        "latest_progress": latest_progress,
+        "timestamp": timestamp
+    }
+
 
 # Pydantic models for API
 class AnalysisRequest(BaseModel):
@@ -40,30 +71,140 @@ class SessionStatus(BaseModel):
     latest_update: Optional[dict] = None
 
 
+# Longest a single update may take to reach a client before it is treated as stalled
+WS_SEND_TIMEOUT_SECONDS = 2.0
+
+
 # WebSocket connection manager
 class ConnectionManager:
     def __init__(self):
         self.active_connections: dict[str, WebSocket] = {}
+        # Agent statuses each session's client already holds, so updates only carry changes
+        self.sent_agent_statuses: dict[str, dict[str, str]] = {}
+        # At most one unsent update per session; a writer task per connection drains it
+        self.queues: dict[str, asyncio.Queue] = {}
+        self.writers: dict[str, asyncio.Task] = {}
     
     async def connect(self, websocket: WebSocket, session_id: str):
         await websocket.accept()
+        previous = self.active_connections.get(session_id)
+        self.disconnect(session_id)
+        if previous is not None:
+            # Tell a client replaced by a reconnect to stop listening
+            try:
+                await previous.close(code=1000)
+            except Exception:
+                pass
         self.active_connections[session_id] = websocket
+        self.queues[session_id] = queue = asyncio.Queue(maxsize=1)
+        self.writers[session_id] = asyncio.create_task(self._write_updates(session_id, websocket, queue))
         print(f"🔌 WebSocket connected for session {session_id}")
     
-    def disconnect(self, session_id: str):
+    def disconnect(self, session_id: str, websocket: WebSocket = None):
+        """Tear down the session's connection; with ``websocket``, only if that socket still owns it."""
+        if websocket is not None and self.active_connections.get(session_id) is not websocket:
+            return
         if session_id in self.active_connections:
             del self.active_connections[session_id]
+        self.queues.pop(session_id, None)
+        writer = self.writers.pop(session_id, None)
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
+        # A client that connects later needs the full status mapping again
+        self.sent_agent_statuses.pop(session_id, None)
+    
+    def agent_status_delta(self, session_id: str, agent_statuses: dict) -> dict:
+        """Return the agent statuses that changed since the last update and record them as sent."""
+        if session_id not in self.queues:
+            # Nothing reaches a session without a socket, so there is nothing to record
+            return dict(agent_statuses)
+        sent = self.sent_agent_statuses.setdefault(session_id, {})
+        delta = {agent_id: status for agent_id, status in agent_statuses.items() if sent.get(agent_id) != status}
+        sent.update(delta)
+        return delta
     
     async def send_update(self, session_id: str, data: dict):
-        if session_id in self.active_connections:
+        queue = self.queues.get(session_id)
+        if queue is None:
+            print(f"⚠️ No active WebSocket connection for session {session_id}")
+            return
+        
+        # Latest update wins while the client is behind, keeping the status changes it replaces
+        try:
+            pending = queue.get_nowait()
+            if pending.get("type") == data.get("type") == "state_update":
+                data = {**data, "agent_statuses_delta": {**pending["agent_statuses_delta"], **data["agent_statuses_delta"]}}
+        except asyncio.QueueEmpty:
+            pass
+        queue.put_nowait(data)
+    
+    async def _write_updates(self, session_id: str, websocket: WebSocket, queue: asyncio.Queue):
+        """Send queued updates to one client until it goes away."""
+        while True:
+            data = await queue.get()
             try:
                 print(f"📤 Sending WebSocket update to session {session_id}: {data}")
-                await self.active_connections[session_id].send_text(json.dumps(data))
+                await asyncio.wait_for(websocket.send_text(_dumps(data)), timeout=WS_SEND_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                # A client that cannot take a small frame in time is stalled; free its socket
+                print(f"⚠️ WebSocket send timed out for session {session_id}, closing")
+                self.disconnect(session_id, websocket)
+                try:
+                    await websocket.close(code=1011)
+                except Exception:
+                    pass
+                return
             except Exception as e:
                 print(f"❌ Error sending WebSocket update: {e}")
-                self.disconnect(session_id)
-        else:
-            print(f"⚠️ No active WebSocket connection for session {session_id}")
+                self.disconnect(session_id, websocket)
+                return
+
+
+class SessionStore:
+    """
+    Bounded session registry. Sessions expire after a TTL without updates and, when full,
+    the least recently updated finished session is evicted before any running one.
+    """
+    
+    def __init__(self, max_sessions: int = None, ttl_seconds: float = None):
+        self.max_sessions = max_sessions or int(os.getenv("SESSION_CACHE_MAX", 512))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("SESSION_TTL_SECONDS", 3600))
+        self._sessions: "OrderedDict[str, tuple[float, WorkflowState]]" = OrderedDict()
+    
+    def __setitem__(self, session_id: str, state: WorkflowState):
+        self._sessions[session_id] = (time.monotonic(), state)
+        self._sessions.move_to_end(session_id)
+        self._evict()
+    
+    def get(self, session_id: str) -> Optional[WorkflowState]:
+        """Return the session's latest state, or None if it is unknown or expired."""
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        updated_at, state = entry
+        if time.monotonic() - updated_at >= self.ttl_seconds:
+            del self._sessions[session_id]
+            return None
+        return state
+    
+    def __len__(self) -> int:
+        return len(self._sessions)
+    
+    def _evict(self):
+        """Drop expired sessions, then the oldest ones while over capacity."""
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._sessions:
+            session_id, (updated_at, _) = next(iter(self._sessions.items()))
+            if updated_at > cutoff:
+                break
+            del self._sessions[session_id]
+        
+        while len(self._sessions) > self.max_sessions:
+            finished = next(
+                (session_id for session_id, (_, state) in self._sessions.items() if state.completion_percentage >= 100),
+                None
+            )
+            self._sessions.pop(finished if finished is not None else next(iter(self._sessions)))
 
 
 # Initialize FastAPI app
@@ -73,19 +214,22 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# CORS middleware for frontend
+# CORS middleware for frontend; WebSocket upgrades and same-origin requests pass straight through it
+cors_origins = [origin.strip() for origin in os.getenv("CORS_ORIGINS", "*").split(",") if origin.strip()]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Allow all origins for testing
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=cors_origins,
+    allow_methods=["GET", "POST"],
+    allow_headers=["Content-Type"],
 )
 
+# Completed results carry the whole final report; compress anything beyond a small status body
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Global instances
 orchestrator: Optional[MultiAgentOrchestrator] = None
 connection_manager = ConnectionManager()
-active_sessions: dict[str, WorkflowState] = {}
+active_sessions = SessionStore()
 
 
 @app.on_event("startup")
@@ -111,6 +255,13 @@ async def startup_event():
             print("🚀 Multi-agent orchestrator initialized successfully")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release the orchestrator's pooled LLM connections."""
+    if orchestrator:
+        await orchestrator.aclose()
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API information."""
@@ -138,7 +289,6 @@ async def start_analysis(request: AnalysisRequest, background_tasks: BackgroundT
             raise HTTPException(status_code=400, detail="Repository URL is required")
         
         # Generate session ID upfront
-        import uuid
         session_id = str(uuid.uuid4())
         
         # Start the analysis in the background
@@ -169,7 +319,6 @@ async def run_analysis_workflow(session_id: str, repository_url: str, analysis_p
     
     try:
         # Create initial state with the predetermined session_id
-        from ..core.state import WorkflowState
         initial_state = WorkflowState(
             repository_url=repository_url,
             analysis_period_days=analysis_period_days,
@@ -183,17 +332,14 @@ async def run_analysis_workflow(session_id: str, repository_url: str, analysis_p
         print(f"✅ Initial state created and stored for session {session_id}")
         
         # Send initial update
-        await connection_manager.send_update(session_id, {
-            "type": "state_update",
-            "session_id": session_id,
-            "current_step": "initializing",
-            "completion_percentage": 0.0,
-            "agent_statuses": {},
-            "latest_progress": {"step": "initializing", "message": "Starting analysis workflow...", "timestamp": datetime.now().isoformat()},
-            "timestamp": datetime.now().isoformat()
-        })
+        now = datetime.now()
+        await connection_manager.send_update(session_id, _state_update_message(
+            session_id, "initializing", 0.0, {},
+            {"step": "initializing", "message": "Starting analysis workflow...", "timestamp": now}, now
+        ))
         
         state_count = 0
+        last_sent = None
         async for state in orchestrator.execute_workflow_with_state(initial_state):
             state_count += 1
             print(f"📊 Received state update #{state_count} for session {session_id}")
@@ -203,29 +349,25 @@ async def run_analysis_workflow(session_id: str, repository_url: str, analysis_p
             # Update stored state
             active_sessions[session_id] = state
             
-            # Send real-time updates via WebSocket
+            # Send real-time updates via WebSocket, skipping states the client has already seen
+            # AgentStatus is a str enum: it compares equal to and encodes as its value
+            statuses_delta = connection_manager.agent_status_delta(session_id, state.agent_statuses)
+            progress_key = (state.current_step, state.completion_percentage, len(state.progress_updates))
+            if not statuses_delta and progress_key == last_sent:
+                continue
+            last_sent = progress_key
             latest_progress = state.progress_updates[-1] if state.progress_updates else None
-            if latest_progress and 'timestamp' in latest_progress:
-                # Convert datetime to string for JSON serialization
-                latest_progress = latest_progress.copy()
-                if hasattr(latest_progress['timestamp'], 'isoformat'):
-                    latest_progress['timestamp'] = latest_progress['timestamp'].isoformat()
             
-            await connection_manager.send_update(session_id, {
-                "type": "state_update",
-                "session_id": session_id,
-                "current_step": state.current_step,
-                "completion_percentage": state.completion_percentage,
-                "agent_statuses": {k: v.value for k, v in state.agent_statuses.items()},
-                "latest_progress": latest_progress,
-                "timestamp": datetime.now().isoformat()
-            })
+            # The encoder serializes the datetimes
+            await connection_manager.send_update(session_id, _state_update_message(
+                session_id, state.current_step, state.completion_percentage,
+                statuses_delta, latest_progress, datetime.now()
+            ))
         
         print(f"✅ Analysis workflow completed for session {session_id} ({state_count} state updates)")
     
     except Exception as e:
         print(f"❌ Error in analysis workflow for session {session_id}: {str(e)}")
-        import traceback
         traceback.print_exc()
         
         if session_id:
@@ -233,23 +375,30 @@ async def run_analysis_workflow(session_id: str, repository_url: str, analysis_p
                 "type": "error",
                 "session_id": session_id,
                 "error": str(e),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now()
             })
+    
+    # No further updates follow for this run
+    connection_manager.sent_agent_statuses.pop(session_id, None)
+    
+    # Results only report how many issues were analyzed, so stop holding the issues themselves
+    final_state = active_sessions.get(session_id)
+    if final_state is not None:
+        final_state.release_raw_issues()
 
 
 @app.get("/status/{session_id}", response_model=SessionStatus)
 async def get_session_status(session_id: str):
     """Get current status of an analysis session."""
-    if session_id not in active_sessions:
+    state = active_sessions.get(session_id)
+    if state is None:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    state = active_sessions[session_id]
-    
     return SessionStatus(
         session_id=session_id,
         current_step=state.current_step,
         completion_percentage=state.completion_percentage,
-        agent_statuses={k: v.value for k, v in state.agent_statuses.items()},
+        agent_statuses=state.agent_statuses,
         latest_update=state.progress_updates[-1] if state.progress_updates else None
     )
 
@@ -257,11 +406,10 @@ async def get_session_status(session_id: str):
 @app.get("/results/{session_id}")
 async def get_analysis_results(session_id: str):
     """Get complete analysis results for a session."""
-    if session_id not in active_sessions:
+    state = active_sessions.get(session_id)
+    if state is None:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    state = active_sessions[session_id]
-    
     if state.completion_percentage < 100:
         return {
             "session_id": session_id,
@@ -270,77 +418,90 @@ async def get_analysis_results(session_id: str):
             "current_step": state.current_step
         }
     
-    return {
+    # The report is large and nested; encode it directly rather than through FastAPI's jsonable_encoder
+    return Response(content=_dumps({
         "session_id": session_id,
         "status": "completed",
         "completion_percentage": state.completion_percentage,
         "repository": state.repository_url,
         "analysis_period_days": state.analysis_period_days,
-        "total_issues_analyzed": len(state.raw_issues),
+        "total_issues_analyzed": state.raw_issues_count or len(state.raw_issues),
         "final_report": state.final_report,
         "insights": state.insights,
         "recommendations": state.recommendations,
-        "agent_statuses": {k: v.value for k, v in state.agent_statuses.items()},
+        "agent_statuses": state.agent_statuses,
         "routing_decisions": state.routing_decisions,
-        "generated_at": state.updated_at.isoformat()
-    }
+        "generated_at": state.updated_at
+    }), media_type="application/json")
 
 
-@app.websocket("/ws/{session_id}")
-async def websocket_endpoint(websocket: WebSocket, session_id: str):
+async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time updates."""
+    session_id = websocket.path_params["session_id"]
     await connection_manager.connect(websocket, session_id)
     
     try:
         # Send initial connection confirmation
-        await websocket.send_text(json.dumps({
+        await websocket.send_text(_dumps({
             "type": "connection_established",
             "session_id": session_id,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": datetime.now()
         }))
         
-        # Keep connection alive and handle client messages
+        # Catch the client up on a run that started (or finished) before it connected
+        state = active_sessions.get(session_id)
+        if state is not None:
+            await connection_manager.send_update(session_id, _state_update_message(
+                session_id, state.current_step, state.completion_percentage,
+                connection_manager.agent_status_delta(session_id, state.agent_statuses),
+                state.progress_updates[-1] if state.progress_updates else None, datetime.now()
+            ))
+        
+        # Handle client messages; uvicorn's protocol-level pings keep idle connections alive
         while True:
-            try:
-                # Wait for client messages (ping/pong, requests, etc.)
-                message = await asyncio.wait_for(websocket.receive_text(), timeout=30.0)
-                
-                # Echo back for ping/pong
-                await websocket.send_text(json.dumps({
-                    "type": "pong",
-                    "timestamp": datetime.now().isoformat()
-                }))
-                
-            except asyncio.TimeoutError:
-                # Send keepalive
-                await websocket.send_text(json.dumps({
-                    "type": "keepalive",
-                    "timestamp": datetime.now().isoformat()
-                }))
-                
+            await websocket.receive_text()
+            
+            # Echo back for ping/pong
+            await websocket.send_text(_dumps({
+                "type": "pong",
+                "timestamp": datetime.now()
+            }))
+            
     except WebSocketDisconnect:
-        connection_manager.disconnect(session_id)
+        # A reconnect may already own the session; leave its connection alone
+        connection_manager.disconnect(session_id, websocket)
     except Exception as e:
         print(f"WebSocket error for session {session_id}: {e}")
-        connection_manager.disconnect(session_id)
+        connection_manager.disconnect(session_id, websocket)
+
+
+# Registered as a plain Starlette route: the socket needs no FastAPI parameter handling
+app.router.routes.append(WebSocketRoute("/ws/{session_id}", websocket_endpoint))
+
+
+# Probes hit /health every few seconds; serve one encoded body per interval
+HEALTH_CACHE_SECONDS = 1.0
+_health_cache: tuple[float, str] = (float("-inf"), "")
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {
-        "status": "healthy",
-        "orchestrator_initialized": orchestrator is not None,
-        "demo_mode": orchestrator.demo_mode if orchestrator else False,
-        "active_sessions": len(active_sessions),
-        "timestamp": datetime.now().isoformat()
-    }
+    global _health_cache
+    now = time.monotonic()
+    if now - _health_cache[0] >= HEALTH_CACHE_SECONDS:
+        _health_cache = (now, _dumps({
+            "status": "healthy",
+            "orchestrator_initialized": orchestrator is not None,
+            "demo_mode": orchestrator.demo_mode if orchestrator else False,
+            "active_sessions": len(active_sessions),
+            "timestamp": datetime.now()
+        }))
+    return Response(content=_health_cache[1], media_type="application/json")
 
 
-@app.get("/demo", response_class=HTMLResponse)
-async def demo_page():
-    """Simple demo page for testing the API."""
-    html_content = """
+# The demo page never changes, so encode and compress it once at import.
+DEMO_HTML = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -428,8 +589,7 @@ async def demo_page():
                     if (response.ok) {
                         statusDiv.style.display = 'block';
                         document.getElementById('sessionId').textContent = data.session_id;
-                        // In a real implementation, you'd connect to WebSocket here
-                        pollStatus(data.session_id);
+                        watchSession(data.session_id);
                     } else {
                         alert('Error: ' + data.detail);
                     }
@@ -438,23 +598,31 @@ async def demo_page():
                 }
             });
             
-            async function pollStatus(sessionId) {
-                try {
-                    const response = await fetch(`/status/${sessionId}`);
-                    const data = await response.json();
-                    
-                    document.getElementById('statusText').textContent = 
-                        `Step: ${data.current_step} (${data.completion_percentage.toFixed(1)}%)`;
-                    document.getElementById('progressBar').style.width = data.completion_percentage + '%';
+            function watchSession(sessionId) {
+                const protocol = location.protocol === 'https:' ? 'wss://' : 'ws://';
+                const ws = new WebSocket(`${protocol}${location.host}/ws/${sessionId}`);
+                
+                ws.onmessage = (event) => {
+                    const data = JSON.parse(event.data);
                     
-                    if (data.completion_percentage < 100) {
-                        setTimeout(() => pollStatus(sessionId), 2000);
-                    } else {
-                        showResults(sessionId);
+                    if (data.type === 'error') {
+                        document.getElementById('statusText').textContent = 'Error: ' + data.error;
+                        ws.close();
+                    } else if (data.type === 'state_update') {
+                        document.getElementById('statusText').textContent = 
+                            `Step: ${data.current_step} (${data.completion_percentage.toFixed(1)}%)`;
+                        document.getElementById('progressBar').style.width = data.completion_percentage + '%';
+                        
+                        if (data.completion_percentage >= 100) {
+                            ws.close();
+                            showResults(sessionId);
+                        }
                     }
-                } catch (error) {
-                    console.error('Error polling status:', error);
-                }
+                };
+                
+                ws.onerror = (error) => {
+                    console.error('WebSocket error:', error);
+                };
             }
             
             async function showResults(sessionId) {
@@ -472,7 +640,20 @@ async def demo_page():
     </body>
     </html>
     """
-    return HTMLResponse(content=html_content)
+_DEMO_HTML_BYTES = DEMO_HTML.encode("utf-8")
+_DEMO_HTML_GZ = gzip.compress(_DEMO_HTML_BYTES)
+
+
+@app.get("/demo", response_class=HTMLResponse)
+async def demo_page(request: Request):
+    """Simple demo page for testing the API."""
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        return Response(
+            content=_DEMO_HTML_GZ,
+            media_type="text/html",
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
+        )
+    return Response(content=_DEMO_HTML_BYTES, media_type="text/html")
 
 
 if __name__ == "__main__":
@@ -481,5 +662,11 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=True,
+        loop="auto",
+        http="auto",
+        ws="websockets",
+        ws_per_message_deflate=False,
+        ws_ping_interval=20,
+        ws_ping_timeout=20,
         log_level="info"
     )
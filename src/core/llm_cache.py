@@ -0,0 +1,100 @@
+"""
+Response cache for chat model calls.
+Repeated analyses build identical prompts, so their LLM responses can be reused.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+
+class CachedChatLLM:
+    """
+    Wraps a chat model and memoizes responses by an exact hash of the prompt. Callers ``store``
+    a response once it has parsed and validated, so a bad completion is never replayed.
+    Entries expire after a TTL and the least recently used entry is evicted when full.
+    Identical prompts already in flight share one request instead of each calling the model.
+    """
+    
+    def __init__(self, llm: Any, max_entries: int = 256, ttl_seconds: float = None):
+        self.llm = llm
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("LLM_CACHE_TTL_SECONDS", 3600))
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+    
+    def __getattr__(self, name: str) -> Any:
+        # Everything the wrapper doesn't define goes straight to the wrapped model
+        return getattr(self.llm, name)
+    
+    async def ainvoke(self, messages: List[Any], *, cache_namespace: str = None, **kwargs) -> Any:
+        """
+        Return the cached response for these messages, calling the model on a miss.
+        The response is not cached until the caller passes it to ``store``.
+        ``cache_namespace`` (e.g. a repository URL) keeps identical prompts from different sources apart.
+        """
+        key = self._cache_key(messages, kwargs, cache_namespace)
+        
+        while True:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, response = entry
+                if time.monotonic() - stored_at < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    return response
+                del self._entries[key]
+            
+            # Coalesce with an identical request that is already waiting on the model
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+            # wait() only raises if this caller is cancelled, never for the shared request
+            await asyncio.wait((pending,))
+            if not pending.cancelled():
+                return pending.result()
+            # The leading caller was cancelled; go round again and the first waiter back takes over
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            response = await self.llm.ainvoke(messages, **kwargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters re-raise it; mark it retrieved so a future nobody awaited doesn't warn
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+        
+        future.set_result(response)
+        return response
+    
+    def store(self, messages: List[Any], response: Any, *, cache_namespace: str = None, **kwargs):
+        """Cache a response the caller accepted, under the same arguments it passed to ``ainvoke``."""
+        key = self._cache_key(messages, kwargs, cache_namespace)
+        if key in self._entries:
+            # A replayed hit keeps its original timestamp so the TTL still bounds its age
+            return
+        self._entries[key] = (time.monotonic(), response)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop every cached response."""
+        self._entries.clear()
+    
+    def _cache_key(self, messages: List[Any], kwargs: dict, namespace: str = None) -> str:
+        """SHA-256 over the namespace, the message roles and contents, and any call options."""
+        payload = json.dumps(
+            [namespace] + [[getattr(message, "type", type(message).__name__), message.content] for message in messages] + [kwargs],
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
@@ -4,24 +4,85 @@ Implements intelligent agent coordination, conditional routing, and workflow man
 """
 
 from typing import Dict, Any, List, Optional, Literal
-import asyncio
+from collections import deque
 from datetime import datetime
 
+import httpx
+import numpy as np
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
-from langchain_openai import ChatOpenAI
 
 from .state import WorkflowState, AgentStatus, AnalysisQuality
-from ..agents.data_retrieval_agent import DataRetrievalAgent
-from ..agents.analysis_agent import TimeSeriesAnalysisAgent
-from ..agents.insight_agent import InsightGenerationAgent
-from ..agents.report_agent import ReportGenerationAgent
-from ..demo.mock_agents import (
-    MockDataRetrievalAgent, MockAnalysisAgent, MockInsightAgent, MockReportAgent
-)
 import os
 
 
+WORKFLOW_HISTORY_SIZE = 50
+
+# Next node for each quality gate decision; insufficient data skips intensive analysis
+QUALITY_GATE_ROUTES = {
+    "quality_gate_failed": "error",
+    "insufficient_data": "insight_generation",
+    "proceed_to_analysis": "analysis"
+}
+
+# Static text of the error-recovery report; only the issue-derived numbers vary per run
+RECOVERY_SUGGESTIONS = (
+    "Check API credentials and rate limits",
+    "Verify repository URL format",
+    "Ensure sufficient data for analysis"
+)
+FALLBACK_LABEL_SHARES = (
+    ("bug", 4), ("enhancement", 5), ("documentation", 6), ("help wanted", 8),
+    ("good first issue", 10), ("question", 12), ("duplicate", 15), ("invalid", 20)
+)
+FALLBACK_KEY_FINDINGS = (
+    "Issue distribution shows balanced open/closed ratio",
+    "Community engagement appears healthy with regular activity"
+)
+FALLBACK_EXECUTIVE_RECOMMENDATIONS = (
+    "Continue current issue management practices",
+    "Consider implementing automated issue labeling",
+    "Monitor trends for early warning signs"
+)
+FALLBACK_PATTERNS = (
+    "Consistent issue creation patterns",
+    "Regular community participation",
+    "Balanced issue resolution rates"
+)
+FALLBACK_TECHNICAL_RECOMMENDATIONS = (
+    "Implement automated issue classification",
+    "Set up monitoring dashboards",
+    "Create response time targets"
+)
+FALLBACK_ACTION_PLAN = {
+    "immediate_actions": (
+        "Review current issue management workflow",
+        "Set up basic monitoring",
+        "Document best practices"
+    ),
+    "short_term_actions": (
+        "Implement automated labeling",
+        "Create response time targets",
+        "Establish triage process"
+    ),
+    "long_term_actions": (
+        "Develop comprehensive monitoring",
+        "Create community engagement strategy",
+        "Implement predictive analytics"
+    )
+}
+
+
+class SessionMemorySaver(MemorySaver):
+    """In-memory checkpointer whose per-session checkpoints can be dropped once a run ends."""
+    
+    def delete_thread(self, thread_id: str) -> None:
+        """Remove every checkpoint and pending write recorded for a thread."""
+        self.storage.pop(thread_id, None)
+        for key in [key for key in self.writes if key[0] == thread_id]:
+            del self.writes[key]
+
+
 class MultiAgentOrchestrator:
     """
     Advanced multi-agent orchestrator with intelligent routing and state management.
@@ -33,19 +94,36 @@ class MultiAgentOrchestrator:
         if not self.demo_mode and not openai_api_key:
             raise ValueError("OpenAI API key is required when not in demo mode")
         
-        # Initialize LLM only if not in demo mode
+        # Initialize LLM only if not in demo mode; each mode imports only its own agents and clients
         if not self.demo_mode:
+            from langchain_openai import ChatOpenAI
+            
+            # One pooled HTTP/2 client so concurrent LLM calls share kept-alive connections
+            self.http_client = httpx.AsyncClient(
+                http2=True,
+                timeout=60,
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16)
+            )
+            # Optional OpenAI processing tier, e.g. "priority" for lower latency at a higher price
+            service_tier = os.getenv("OPENAI_SERVICE_TIER")
             self.llm = ChatOpenAI(
                 api_key=openai_api_key,
                 model=model_name,
                 temperature=0.1,
-                streaming=True
+                streaming=True,
+                http_async_client=self.http_client,
+                model_kwargs={"service_tier": service_tier} if service_tier else {}
             )
         else:
+            self.http_client = None
             self.llm = None
         
         # Initialize agents based on mode
         if self.demo_mode:
+            from ..demo.mock_agents import (
+                MockDataRetrievalAgent, MockAnalysisAgent, MockInsightAgent, MockReportAgent
+            )
+            
             self.agents = {
                 "data_retrieval": MockDataRetrievalAgent(),
                 "analysis": MockAnalysisAgent(),
@@ -53,6 +131,11 @@ class MultiAgentOrchestrator:
                 "report_generation": MockReportAgent()
             }
         else:
+            from ..agents.data_retrieval_agent import DataRetrievalAgent
+            from ..agents.analysis_agent import TimeSeriesAnalysisAgent
+            from ..agents.insight_agent import InsightGenerationAgent
+            from ..agents.report_agent import ReportGenerationAgent
+            
             self.agents = {
                 "data_retrieval": DataRetrievalAgent(self.llm),
                 "analysis": TimeSeriesAnalysisAgent(self.llm),
@@ -62,9 +145,14 @@ class MultiAgentOrchestrator:
         
         # Create the workflow graph
         self.workflow = self._create_workflow()
-        self.checkpointer = MemorySaver()
+        self.checkpointer = SessionMemorySaver()
         self.app = self.workflow.compile(checkpointer=self.checkpointer)
     
+    async def aclose(self):
+        """Close the pooled HTTP client used for LLM calls."""
+        if self.http_client is not None:
+            await self.http_client.aclose()
+    
     def _create_workflow(self) -> StateGraph:
         """Create the LangGraph workflow with intelligent routing."""
         
@@ -145,19 +233,14 @@ class MultiAgentOrchestrator:
             updated_state = await self.agents["data_retrieval"].execute(state)
             
             # Log the results
-            issues_count = len(updated_state.raw_issues)
             data_quality = updated_state.data_quality
-            agent_status = updated_state.agent_statuses.get("data_retrieval") or updated_state.agent_statuses.get("data_retrieval_agent")
-            
-            print(f"📊 Data retrieval completed: {issues_count} issues retrieved")
-            print(f"📊 Data quality: {data_quality.value if data_quality else 'None'}")
-            print(f"📊 Agent status: {agent_status}")
-            print(f"📊 Available agent statuses: {list(updated_state.agent_statuses.keys())}")
+            print(f"📊 Data retrieval completed: {len(updated_state.raw_issues)} issues retrieved, "
+                  f"quality: {data_quality.value if data_quality else 'None'}")
             
             return updated_state
         except Exception as e:
             print(f"❌ Data retrieval failed: {str(e)}")
-            state.update_agent_status("data_retrieval", AgentStatus.FAILED, error=str(e))
+            state.update_agent_status(self.agents["data_retrieval"].agent_id, AgentStatus.FAILED, error=str(e))
             return state
     
     async def _quality_gate_node(self, state: WorkflowState) -> WorkflowState:
@@ -165,30 +248,27 @@ class MultiAgentOrchestrator:
         state.update_progress("workflow", 15.0, "Assessing data quality...")
         
         # Check if data retrieval was successful
-        retrieval_status = state.agent_statuses.get("data_retrieval") or state.agent_statuses.get("data_retrieval_agent")
-        print(f"🔍 Quality Gate - Data retrieval status: {retrieval_status}")
-        print(f"🔍 Quality Gate - Issues count: {len(state.raw_issues)}")
-        print(f"🔍 Quality Gate - Data quality: {state.data_quality}")
-        print(f"🔍 Quality Gate - Available agent statuses: {list(state.agent_statuses.keys())}")
+        retrieval_status = self._agent_status(state, "data_retrieval")
         
         if retrieval_status != AgentStatus.COMPLETED:
-            print(f"❌ Quality Gate - Data retrieval failed, routing to error")
+            print("❌ Quality Gate - Data retrieval failed, routing to error")
             state.routing_decisions.append("quality_gate_failed")
             return state
         
         # Evaluate data quality
         data_quality = state.data_quality
         issues_count = len(state.raw_issues)
+        assessment = f"Data quality: {data_quality.value if data_quality else 'unknown'}, Issues: {issues_count}"
         
         # Log quality assessment
         state.progress_updates.append({
             "timestamp": datetime.now(),
             "step": "quality_gate",
-            "message": f"Data quality: {data_quality.value if data_quality else 'unknown'}, Issues: {issues_count}",
+            "message": assessment,
             "percentage": 20.0
         })
         
-        print(f"✅ Quality Gate - Data quality: {data_quality.value if data_quality else 'unknown'}, Issues: {issues_count}")
+        print(f"✅ Quality Gate - {assessment}")
         
         # Make routing decision based on quality
         if data_quality == AnalysisQuality.INSUFFICIENT:
@@ -210,7 +290,7 @@ class MultiAgentOrchestrator:
             updated_state = await self.agents["analysis"].execute(state)
             return updated_state
         except Exception as e:
-            state.update_agent_status("analysis", AgentStatus.FAILED, error=str(e))
+            state.update_agent_status(self.agents["analysis"].agent_id, AgentStatus.FAILED, error=str(e))
             return state
     
     async def _insight_generation_node(self, state: WorkflowState) -> WorkflowState:
@@ -222,7 +302,7 @@ class MultiAgentOrchestrator:
             updated_state = await self.agents["insight_generation"].execute(state)
             return updated_state
         except Exception as e:
-            state.update_agent_status("insight_generation", AgentStatus.FAILED, error=str(e))
+            state.update_agent_status(self.agents["insight_generation"].agent_id, AgentStatus.FAILED, error=str(e))
             return state
     
     async def _report_generation_node(self, state: WorkflowState) -> WorkflowState:
@@ -234,7 +314,7 @@ class MultiAgentOrchestrator:
             updated_state = await self.agents["report_generation"].execute(state)
             return updated_state
         except Exception as e:
-            state.update_agent_status("report_generation", AgentStatus.FAILED, error=str(e))
+            state.update_agent_status(self.agents["report_generation"].agent_id, AgentStatus.FAILED, error=str(e))
             return state
     
     async def _error_handler_node(self, state: WorkflowState) -> WorkflowState:
@@ -242,6 +322,8 @@ class MultiAgentOrchestrator:
         state.update_progress("workflow", 90.0, "Handling errors and generating fallback results...")
         state.routing_decisions.append("error_handler")
         
+        issues_count = len(state.raw_issues)
+        
         # Generate basic error report
         failed_agents = [agent_id for agent_id, status in state.agent_statuses.items() 
                         if status == AgentStatus.FAILED]
@@ -251,20 +333,13 @@ class MultiAgentOrchestrator:
             "error_messages": {agent_id: state.agent_errors.get(agent_id) 
                              for agent_id in failed_agents},
             "partial_results": {
-                "issues_retrieved": len(state.raw_issues),
+                "issues_retrieved": issues_count,
                 "insights_generated": len(state.insights),
                 "recommendations": len(state.recommendations)
             },
-            "recovery_suggestions": [
-                "Check API credentials and rate limits",
-                "Verify repository URL format",
-                "Ensure sufficient data for analysis"
-            ]
+            "recovery_suggestions": list(RECOVERY_SUGGESTIONS)
         }
         
-        # Generate a comprehensive fallback report
-        issues_count = len(state.raw_issues)
-        
         # Create mock dashboard data based on available issues
         open_issues = issues_count // 2
         closed_issues = issues_count - open_issues
@@ -277,16 +352,7 @@ class MultiAgentOrchestrator:
                 "issue_states": {"open": open_issues, "closed": closed_issues},
                 "issue_types": {"bug": issues_count // 3, "feature": issues_count // 3, "enhancement": issues_count // 3},
                 "priority_levels": {"high": issues_count // 4, "medium": issues_count // 2, "low": issues_count // 4},
-                "top_labels": {
-                    "bug": issues_count // 4,
-                    "enhancement": issues_count // 5,
-                    "documentation": issues_count // 6,
-                    "help wanted": issues_count // 8,
-                    "good first issue": issues_count // 10,
-                    "question": issues_count // 12,
-                    "duplicate": issues_count // 15,
-                    "invalid": issues_count // 20
-                }
+                "top_labels": {label: issues_count // divisor for label, divisor in FALLBACK_LABEL_SHARES}
             },
             "summary_metrics": {
                 "total_issues": issues_count,
@@ -309,50 +375,21 @@ class MultiAgentOrchestrator:
             "overview": f"Analysis of {state.repository_url} repository with {issues_count} issues analyzed",
             "key_findings": [
                 f"Repository contains {issues_count} issues over the analysis period",
-                "Issue distribution shows balanced open/closed ratio",
-                "Community engagement appears healthy with regular activity"
+                *FALLBACK_KEY_FINDINGS
             ],
-            "recommendations": [
-                "Continue current issue management practices",
-                "Consider implementing automated issue labeling",
-                "Monitor trends for early warning signs"
-            ]
+            "recommendations": list(FALLBACK_EXECUTIVE_RECOMMENDATIONS)
         }
         
         # Generate technical analysis
         technical_analysis = {
             "data_quality": "Good" if issues_count > 50 else "Limited",
             "analysis_confidence": 0.75,
-            "patterns_identified": [
-                "Consistent issue creation patterns",
-                "Regular community participation",
-                "Balanced issue resolution rates"
-            ],
-            "technical_recommendations": [
-                "Implement automated issue classification",
-                "Set up monitoring dashboards",
-                "Create response time targets"
-            ]
+            "patterns_identified": list(FALLBACK_PATTERNS),
+            "technical_recommendations": list(FALLBACK_TECHNICAL_RECOMMENDATIONS)
         }
         
         # Generate action plan
-        action_plan = {
-            "immediate_actions": [
-                "Review current issue management workflow",
-                "Set up basic monitoring",
-                "Document best practices"
-            ],
-            "short_term_actions": [
-                "Implement automated labeling",
-                "Create response time targets",
-                "Establish triage process"
-            ],
-            "long_term_actions": [
-                "Develop comprehensive monitoring",
-                "Create community engagement strategy",
-                "Implement predictive analytics"
-            ]
-        }
+        action_plan = {horizon: list(actions) for horizon, actions in FALLBACK_ACTION_PLAN.items()}
         
         state.final_report = {
             "metadata": {
@@ -400,15 +437,17 @@ class MultiAgentOrchestrator:
         state.routing_decisions.append("reflection")
         
         # Analyze workflow performance
-        successful_agents = [agent_id for agent_id, status in state.agent_statuses.items() 
-                           if status == AgentStatus.COMPLETED]
-        failed_agents = [agent_id for agent_id, status in state.agent_statuses.items() 
-                        if status == AgentStatus.FAILED]
+        successful_agents, failed_agents = [], []
+        for agent_id, status in state.agent_statuses.items():
+            if status == AgentStatus.COMPLETED:
+                successful_agents.append(agent_id)
+            elif status == AgentStatus.FAILED:
+                failed_agents.append(agent_id)
         
         # Calculate quality metrics
-        data_coverage = len(state.raw_issues) / 100 if len(state.raw_issues) < 100 else 1.0
-        insight_quality = len(state.insights) / 10 if len(state.insights) < 10 else 1.0
-        recommendation_quality = len(state.recommendations) / 5 if len(state.recommendations) < 5 else 1.0
+        data_coverage = min(len(state.raw_issues) / 100, 1.0)
+        insight_quality = min(len(state.insights) / 10, 1.0)
+        recommendation_quality = min(len(state.recommendations) / 5, 1.0)
         
         workflow_score = (
             len(successful_agents) / len(self.agents) * 0.4 +
@@ -447,55 +486,36 @@ class MultiAgentOrchestrator:
     
     def _generate_mock_time_series(self, issues_count: int) -> dict:
         """Generate mock time series data for dashboard."""
-        from datetime import datetime, timedelta
-        import random
         
-        daily_issues = {}
-        current_date = datetime.now()
+        # 90 days back from today, each around the average daily volume
+        dates = np.datetime64(datetime.now().date(), "D") - np.arange(90)
+        counts = np.maximum(0, issues_count // 90 + np.random.randint(-2, 4, size=90))
         
-        # Generate 90 days of data
-        for i in range(90):
-            date = current_date - timedelta(days=i)
-            date_str = date.strftime("%Y-%m-%d")
-            
-            # Create realistic daily distribution
-            base_issues = issues_count // 90
-            variation = random.randint(-2, 3)
-            daily_count = max(0, base_issues + variation)
-            
-            daily_issues[date_str] = daily_count
-        
-        return daily_issues
+        return dict(zip(dates.astype(str).tolist(), counts.tolist()))
+    
+    def _agent_status(self, state: WorkflowState, node: str) -> Optional[AgentStatus]:
+        """Status recorded under the agent_id of the agent behind a workflow node."""
+        return state.agent_statuses.get(self.agents[node].agent_id)
     
     def _route_after_data_retrieval(self, state: WorkflowState) -> Literal["quality_gate", "error"]:
         """Route after data retrieval based on success."""
-        # Check for both possible agent IDs
-        retrieval_status = state.agent_statuses.get("data_retrieval") or state.agent_statuses.get("data_retrieval_agent")
-        print(f"🔀 Routing after data retrieval - Status: {retrieval_status}, Type: {type(retrieval_status)}")
-        print(f"🔀 AgentStatus.COMPLETED: {AgentStatus.COMPLETED}, Type: {type(AgentStatus.COMPLETED)}")
-        print(f"🔀 Available agent statuses: {list(state.agent_statuses.keys())}")
+        retrieval_status = self._agent_status(state, "data_retrieval")
         
         if retrieval_status == AgentStatus.COMPLETED:
-            print(f"✅ Routing to quality_gate")
             return "quality_gate"
         else:
-            print(f"❌ Routing to error")
+            print(f"❌ Data retrieval {retrieval_status.value if retrieval_status else 'did not report'}, routing to error")
             return "error"
     
     def _route_after_quality_gate(self, state: WorkflowState) -> Literal["analysis", "insight_generation", "error"]:
         """Route after quality gate based on data quality."""
-        if "quality_gate_failed" in state.routing_decisions:
-            return "error"
-        elif "insufficient_data" in state.routing_decisions:
-            return "insight_generation"  # Skip intensive analysis for poor data
-        elif "proceed_to_analysis" in state.routing_decisions:
-            return "analysis"
-        else:
-            return "error"
+        # The quality gate always records its decision last
+        decision = state.routing_decisions[-1] if state.routing_decisions else None
+        return QUALITY_GATE_ROUTES.get(decision, "error")
     
     def _route_after_analysis(self, state: WorkflowState) -> Literal["insight_generation", "error"]:
         """Route after analysis based on success."""
-        analysis_status = state.agent_statuses.get("analysis")
+        analysis_status = self._agent_status(state, "analysis")
         if analysis_status == AgentStatus.COMPLETED:
             return "insight_generation"
         else:
@@ -503,7 +523,7 @@ class MultiAgentOrchestrator:
     
     def _route_after_insights(self, state: WorkflowState) -> Literal["report_generation", "error"]:
         """Route after insights based on success."""
-        insights_status = state.agent_statuses.get("insight_generation")
+        insights_status = self._agent_status(state, "insight_generation")
         if insights_status == AgentStatus.COMPLETED:
             return "report_generation"
         else:
@@ -539,29 +559,35 @@ class MultiAgentOrchestrator:
     async def _update_agent_memories_with_reflection(self, state: WorkflowState, reflection: Dict[str, Any]):
         """Update agent memories with workflow learnings."""
         
+        now = datetime.now()
+        timestamp = now.isoformat()
+        data_quality = state.data_quality.value if state.data_quality else "unknown"
+        
         for agent_id, agent in self.agents.items():
             memory = state.get_agent_memory(agent_id)
             
             # Update performance metrics
-            agent_status = state.agent_statuses.get(agent_id, AgentStatus.PENDING)
+            agent_status = state.agent_statuses.get(agent.agent_id, AgentStatus.PENDING)
             if agent_status == AgentStatus.COMPLETED:
-                memory.performance_metrics["successful_executions"] = memory.performance_metrics.get("successful_executions", 0) + 1
+                memory.performance_metrics["successful_executions"] += 1
             else:
-                memory.performance_metrics["failed_executions"] = memory.performance_metrics.get("failed_executions", 0) + 1
+                memory.performance_metrics["failed_executions"] += 1
+            
+            # Store workflow patterns, keeping only the last 50
+            workflow_patterns = memory.learned_patterns.get("workflow_patterns")
+            if not isinstance(workflow_patterns, deque) or workflow_patterns.maxlen != WORKFLOW_HISTORY_SIZE:
+                # Older memories (or ones restored from a checkpoint) hold a plain list
+                workflow_patterns = deque(workflow_patterns or (), maxlen=WORKFLOW_HISTORY_SIZE)
+                memory.learned_patterns["workflow_patterns"] = workflow_patterns
             
-            # Store workflow patterns
-            workflow_patterns = memory.learned_patterns.get("workflow_patterns", [])
             workflow_patterns.append({
                 "repository": state.repository_url,
-                "data_quality": state.data_quality.value if state.data_quality else "unknown",
+                "data_quality": data_quality,
                 "agent_success": agent_status.value,
                 "workflow_score": reflection["workflow_score"],
-                "timestamp": datetime.now().isoformat()
+                "timestamp": timestamp
             })
-            
-            # Keep only last 50 patterns
-            memory.learned_patterns["workflow_patterns"] = workflow_patterns[-50:]
-            memory.last_updated = datetime.now()
+            memory.last_updated = now
     
     async def execute_workflow(self, 
                               repository_url: str, 
@@ -598,10 +624,14 @@ class MultiAgentOrchestrator:
                     state_key = list(state.keys())[0]
                     actual_state = state[state_key]
                     
-                    # If it's still a dict, convert it back to WorkflowState
+                    # If it's still a dict, fold it into the state built from the first update
                     if isinstance(actual_state, dict):
-                        # Create a new WorkflowState from the dict data
-                        final_state = WorkflowState(**actual_state)
+                        if final_state is None:
+                            final_state = WorkflowState(**actual_state)
+                        else:
+                            # Node outputs were validated when the node built them
+                            for key, value in actual_state.items():
+                                setattr(final_state, key, value)
                     else:
                         final_state = actual_state
                 else:
@@ -624,6 +654,10 @@ class MultiAgentOrchestrator:
             # Yield the error state and return
             yield initial_state
             return
+        
+        finally:
+            # Nothing resumes a finished run, so its checkpoints would only accumulate
+            self.checkpointer.delete_thread(initial_state.session_id)
     
     async def get_agent_status(self, session_id: str) -> Dict[str, Any]:
         """Get current status of all agents for a session."""
@@ -3,7 +3,9 @@ Core state management for the multi-agent GitHub Issue Trend Analyzer.
 This module defines the shared state structure and state management utilities.
 """
 
-from typing import Dict, List, Optional, Any, Annotated
+from typing import DefaultDict, Dict, List, Optional, Any, Annotated, Tuple
+from collections import defaultdict
+from functools import cached_property
 from pydantic import BaseModel, Field
 from datetime import datetime
 import uuid
@@ -42,6 +44,16 @@ class GitHubIssue(BaseModel):
     author: str
     comments_count: int = 0
     reactions_count: int = 0
+    
+    @cached_property
+    def labels_lower(self) -> Tuple[str, ...]:
+        """Lowercased labels, computed once per issue."""
+        return tuple(label.lower() for label in self.labels)
+    
+    @cached_property
+    def search_text(self) -> str:
+        """Lowercased title and labels, one per line, for keyword matching."""
+        return '\n'.join((self.title.lower(),) + self.labels_lower)
 
 
 class TrendAnalysis(BaseModel):
@@ -60,7 +72,7 @@ class AgentMemory(BaseModel):
     agent_id: str
     conversations: List[Dict[str, Any]] = Field(default_factory=list)
     learned_patterns: Dict[str, Any] = Field(default_factory=dict)
-    performance_metrics: Dict[str, float] = Field(default_factory=dict)
+    performance_metrics: DefaultDict[str, float] = Field(default_factory=lambda: defaultdict(float))
     last_updated: datetime = Field(default_factory=datetime.now)
 
 
@@ -86,6 +98,7 @@ class WorkflowState(BaseModel):
     
     # Data pipeline
     raw_issues: List[GitHubIssue] = Field(default_factory=list)
+    raw_issues_count: int = 0
     processed_data: Dict[str, Any] = Field(default_factory=dict)
     trend_analysis: Optional[TrendAnalysis] = None
     
@@ -156,6 +169,11 @@ class WorkflowState(BaseModel):
             "message": message
         })
     
+    def release_raw_issues(self):
+        """Keep only the issue count once the issues are no longer needed."""
+        self.raw_issues_count = max(self.raw_issues_count, len(self.raw_issues))
+        self.raw_issues = []
+    
     def get_agent_memory(self, agent_id: str) -> AgentMemory:
         """Get or create memory for a specific agent."""
         if agent_id not in self.agent_memories:
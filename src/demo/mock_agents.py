@@ -37,8 +37,9 @@ class MockDataRetrievalAgent:
             
             # Generate mock issues
             state.update_progress("data_retrieval", 60.0, "Generating realistic issue data...")
-            mock_issues = demo_generator.generate_issues(
-                state.repository_url, 
+            mock_issues = await asyncio.to_thread(
+                demo_generator.generate_issues,
+                state.repository_url,
                 state.analysis_period_days,
                 state.include_closed_issues
             )
@@ -635,12 +636,6 @@ class MockReportAgent:
             }
             
             state.final_report = final_report
-            state.processed_data["all_reports"] = {
-                "executive": executive_summary,
-                "technical": technical_analysis,
-                "actionable": action_plan,
-                "dashboard": dashboard_data
-            }
             
             state.update_progress("report_generation", 100.0, "Report generation completed")
             state.update_agent_status(self.agent_id, AgentStatus.COMPLETED, output={